@@ -1,5 +1,19 @@
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
 import requests
-import xml.etree.ElementTree as ET
+from lxml import etree
+from requests.adapters import HTTPAdapter
 
 from core.graph import Graph
 from tools.nmap import run_scan
@@ -7,8 +21,97 @@ from tools.nmap import run_scan
 OLLAMA_URL = "http://localhost:11434/v1/chat/completions"
 MODEL = "gpt-oss:120b-cloud"
 
+# Shared session so repeated analyze calls reuse the keep-alive connection to Ollama
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# LLM response cache: in-process LRU in front of an on-disk store shared between runs
+LLM_CACHE_DIR = Path.home() / ".cache" / "cybershield" / "llm"
+LLM_CACHE_TTL = 4 * 60 * 60  # seconds
+LLM_MEMORY_CACHE_SIZE = 512
+
+_MEMORY_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_MEMORY_CACHE_LOCK = threading.Lock()
+
+
+def _cache_get(key: str) -> Optional[str]:
+    with _MEMORY_CACHE_LOCK:
+        if key in _MEMORY_CACHE:
+            _MEMORY_CACHE.move_to_end(key)
+            return _MEMORY_CACHE[key]
+
+    path = LLM_CACHE_DIR / f"{key}.json"
+    try:
+        if time.time() - path.stat().st_mtime > LLM_CACHE_TTL:
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["content"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _cache_put(key: str, content: str) -> None:
+    with _MEMORY_CACHE_LOCK:
+        _MEMORY_CACHE[key] = content
+        _MEMORY_CACHE.move_to_end(key)
+        if len(_MEMORY_CACHE) > LLM_MEMORY_CACHE_SIZE:
+            _MEMORY_CACHE.popitem(last=False)
+
+    try:
+        LLM_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=LLM_CACHE_DIR, suffix=".tmp", delete=False
+        ) as f:
+            json.dump({"content": content}, f)
+        os.replace(f.name, LLM_CACHE_DIR / f"{key}.json")
+    except OSError:
+        pass
+    _cache_prune()
 
-def _ollama_chat(system_msg: str, user_msg: str) -> str:
+
+def _cache_prune() -> None:
+    """Delete on-disk entries (and stray temp files) older than the TTL."""
+    cutoff = time.time() - LLM_CACHE_TTL
+    try:
+        with os.scandir(LLM_CACHE_DIR) as entries:
+            for entry in entries:
+                try:
+                    if entry.name.endswith((".json", ".tmp")) and entry.stat().st_mtime < cutoff:
+                        os.unlink(entry.path)
+                except OSError:
+                    pass
+    except OSError:
+        pass
+
+
+def _scan_signature(xml: str) -> str:
+    """
+    Reduce nmap XML to its sorted (address, protocol, port, state, service)
+    tuples, dropping the timestamps and timings that differ on every run.
+    """
+    try:
+        root = etree.fromstring(xml.encode())
+    except etree.XMLSyntaxError:
+        return xml
+    ports = []
+    for host in root.iter("host"):
+        address = host.find("address")
+        addr = address.get("addr", "") if address is not None else ""
+        for port in host.iter("port"):
+            state = port.find("state")
+            service = port.find("service")
+            ports.append((
+                addr,
+                port.get("protocol", ""),
+                port.get("portid", ""),
+                state.get("state", "") if state is not None else "",
+                service.get("name", "") if service is not None else "",
+            ))
+    return json.dumps(sorted(ports))
+
+
+def _ollama_stream(system_msg: str, user_msg: str) -> Iterator[str]:
+    """Yield completion text deltas from Ollama's streaming (SSE) endpoint."""
     payload = {
         "model": MODEL,
         "messages": [
@@ -16,39 +119,86 @@ def _ollama_chat(system_msg: str, user_msg: str) -> str:
             {"role": "user", "content": user_msg},
         ],
         "max_tokens": 1500,
+        "stream": True,
     }
-    r = requests.post(OLLAMA_URL, json=payload, timeout=60)
-    r.raise_for_status()
-    return r.json()["choices"][0]["message"]["content"]
+    with _SESSION.post(OLLAMA_URL, json=payload, timeout=60, stream=True) as r:
+        r.raise_for_status()
+        for line in r.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            data = line[len(b"data: "):]
+            if data == b"[DONE]":
+                break
+            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+            if delta:
+                yield delta
 
 
-def generate_report(target: str) -> str:
+def _ollama_chat(
+    system_msg: str,
+    user_msg: str,
+    on_token: Optional[Callable[[str], None]] = None,
+    cache_basis: Optional[str] = None,
+) -> str:
+    """
+    Return the completion for (system_msg, user_msg), serving repeats from
+    cache. When *on_token* is given each text delta is passed to it as soon
+    as it arrives (a cache hit is delivered as a single chunk). If user_msg
+    carries data that changes between otherwise identical requests, pass
+    the stable part as *cache_basis* to key the cache on it instead.
+    """
+    if cache_basis is None:
+        cache_basis = user_msg
+    key = hashlib.sha256(f"{MODEL}\0{system_msg}\0{cache_basis}".encode()).hexdigest()
+    cached = _cache_get(key)
+    if cached is not None:
+        if on_token:
+            on_token(cached)
+        return cached
+
+    parts = []
+    for delta in _ollama_stream(system_msg, user_msg):
+        parts.append(delta)
+        if on_token:
+            on_token(delta)
+    content = "".join(parts)
+    _cache_put(key, content)
+    return content
+
+
+def generate_report(target: str, on_token: Optional[Callable[[str], None]] = None) -> str:
     """
     Run scans via tools.nmap and format a concise report.
-    Includes service/version info for port 22.
+    Includes service/version info for port 22. If *on_token* is given, the
+    AI analysis is streamed to it while it is generated.
     """
     scan_data = run_scan(target)
 
-    # Parse the version-scan XML for port 22 details
+    # Stream the version-scan XML and stop at the first port 22 service
     port22_info = ""
+    xml_bytes = scan_data["port22_version_scan"].encode()
     try:
-        root = ET.fromstring(scan_data["port22_version_scan"])
-        for host in root.findall("host"):
-            for port in host.findall("./ports/port"):
-                if port.get("portid") == "22":
-                    service = port.find("service")
-                    if service is None:
-                        continue
-                    name = service.get("name", "unknown")
-                    version = (
-                        (service.get("product", "") + " " + service.get("version", ""))
-                        .strip()
-                    )
-                    extra = service.get("extrainfo", "")
-                    port22_info = f"Port 22: {name} {version}".strip()
-                    if extra:
-                        port22_info += f" ({extra})"
-    except ET.ParseError:
+        for _, port in etree.iterparse(BytesIO(xml_bytes), events=("end",), tag="port"):
+            service = port.find("service") if port.get("portid") == "22" else None
+            if service is not None:
+                name = service.get("name", "unknown")
+                version = (
+                    (service.get("product", "") + " " + service.get("version", ""))
+                    .strip()
+                )
+                extra = service.get("extrainfo", "")
+                port22_info = f"Port 22: {name} {version}".strip()
+                if extra:
+                    port22_info += f" ({extra})"
+
+            # Free the processed <port> and any siblings already walked past
+            port.clear()
+            while port.getprevious() is not None:
+                del port.getparent()[0]
+
+            if service is not None:
+                break
+    except etree.XMLSyntaxError:
         port22_info = "Port 22 version data unavailable."
 
     base_report = (
@@ -59,10 +209,13 @@ def generate_report(target: str) -> str:
         f"{port22_info}\n"
     )
 
-    # Send to LLM for higher-level analysis
+    # Send to LLM for higher-level analysis. The raw XML carries scan times,
+    # so the cache is keyed on the parsed scan results instead
     ai_report = _ollama_chat(
         "You are a cybersecurity analyst. Summarize and assess this nmap scan.",
         base_report,
+        on_token=on_token,
+        cache_basis=f"{target}\0{_scan_signature(scan_data['syn_scan'])}\0{port22_info}",
     )
     return ai_report
 
@@ -78,10 +231,13 @@ def scan(target: str):
     print(f"[{target}] Scanning: running nmap scans…")
 
 
-def analyze(target: str):
+def analyze(target: str, stream: bool = False):
     print(f"[{target}] Analyzing: generating AI security report…")
-    report = generate_report(target)
-    print(report)
+    if stream:
+        generate_report(target, on_token=lambda text: print(text, end="", flush=True))
+        print()
+    else:
+        print(generate_report(target))
 
 
 def report_stage(target: str):
@@ -89,15 +245,28 @@ def report_stage(target: str):
     print(f"[{target}] Reporting stage completed.")
 
 
-def run_agent(target: str):
-    """
-    Build a static graph (recon → scan → analyze → report) and walk it.
-    """
+def _build_graph(stream: bool = False) -> Graph:
     g = Graph()
 
     g.set_handler("recon", recon)
     g.set_handler("scan", scan)
-    g.set_handler("analyze", analyze)
+    g.set_handler("analyze", functools.partial(analyze, stream=stream))
     g.set_handler("report", report_stage)
 
-    g.walk(target)
+    return g
+
+
+def run_agent(target: str):
+    """
+    Build a static graph (recon → scan → analyze → report) and walk it.
+    """
+    _build_graph(stream=True).walk(target)
+
+
+def run_agents(targets, concurrency: int = 8):
+    """
+    Walk the same graph for several targets concurrently so their scans and
+    LLM calls overlap instead of running back to back. Reports are printed
+    whole rather than streamed so concurrent targets do not interleave.
+    """
+    asyncio.run(_build_graph().run_many(targets, concurrency=concurrency))
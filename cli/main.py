@@ -1,11 +1,17 @@
 import argparse
-from agents.metatron import run_agent
+from agents.metatron import run_agent, run_agents
 
 def main():
     p = argparse.ArgumentParser(prog="cyberlab-assistant")
-    p.add_argument("-t", "--target", required=True, help="IP or hostname to scan")
+    p.add_argument("-t", "--target", required=True, action="append",
+                   help="IP or hostname to scan (repeat for multiple targets)")
+    p.add_argument("-j", "--concurrency", type=int, default=8,
+                   help="Maximum number of targets processed at once")
     args = p.parse_args()
-    print(run_agent(args.target))
+    if len(args.target) == 1:
+        print(run_agent(args.target[0]))
+    else:
+        run_agents(args.target, concurrency=args.concurrency)
 
 if __name__ == "__main__":
     main()
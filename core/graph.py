@@ -1,3 +1,7 @@
+import asyncio
+import inspect
+
+
 class Graph:
     """
     Very small directed graph modeling the linear pipeline:
@@ -5,25 +9,53 @@ class Graph:
     Each node stores a callable that receives the *target* argument.
     """
 
+    _PIPELINE = ("recon", "scan", "analyze", "report")
+    _INDEX = {name: i for i, name in enumerate(_PIPELINE)}
+
     def __init__(self):
-        self._pipeline = ["recon", "scan", "analyze", "report"]
-        self._handlers = {name: self._default_handler for name in self._pipeline}
+        # Handlers are stored by stage ordinal so walking is a plain iteration
+        self._handlers = [self._default_handler] * len(self._PIPELINE)
 
     def set_handler(self, name, fn):
         """
         Register a custom function for a node.
         fn must accept a single argument – the target.
         """
-        if name not in self._pipeline:
+        index = self._INDEX.get(name)
+        if index is None:
             raise ValueError(f"Unknown node {name!r}")
-        self._handlers[name] = fn
+        self._handlers[index] = fn
 
     def walk(self, target):
         """Execute the pipeline in order, passing target to each handler."""
-        for name in self._pipeline:
-            handler = self._handlers[name]
+        for handler in self._handlers:
             handler(target)
 
+    async def walk_async(self, target):
+        """
+        Async variant of walk(). Coroutine handlers are awaited directly;
+        plain callables run in a worker thread so blocking I/O (nmap, LLM
+        requests) does not stall the event loop.
+        """
+        for handler in self._handlers:
+            if inspect.iscoroutinefunction(handler):
+                await handler(target)
+            else:
+                await asyncio.to_thread(handler, target)
+
+    async def run_many(self, targets, concurrency=8):
+        """
+        Walk the pipeline for every target concurrently, with at most
+        *concurrency* targets in flight at once.
+        """
+        sem = asyncio.Semaphore(concurrency)
+
+        async def bounded(target):
+            async with sem:
+                await self.walk_async(target)
+
+        await asyncio.gather(*(bounded(t) for t in targets))
+
     @staticmethod
     def _default_handler(target):
         print(f"[{target}] default step (no-op)")
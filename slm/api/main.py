@@ -2,24 +2,28 @@ from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
 import yaml
 from pathlib import Path
 import json
 
-# Try to import optional dependencies
+from slm.llm.base import extract_json_object
+from slm.llm.prompts import ANALYSIS_TEMPERATURE, build_analysis_messages
+
 try:
-    import torch
-    HAS_TORCH = True
+    from yaml import CSafeLoader as _SafeLoader
 except ImportError:
-    HAS_TORCH = False
+    from yaml import SafeLoader as _SafeLoader
 
 try:
-    from slm.cyberlab.model import CyberLabSLM
-    from slm.cyberlab.preprocessing import TokenizerWrapper, SecurityLogParser, DataProcessor
-    HAS_CYBERLAB = True
+    from orjson import loads as _json_loads
 except ImportError:
-    HAS_CYBERLAB = False
+    _json_loads = json.loads
+
+# torch and the local model are imported lazily so cloud-only deployments
+# never pay for them.
 
 app = FastAPI(
     title="CyberLab Assistant API",
@@ -34,6 +38,14 @@ PARSER: Optional[Any] = None
 DATA_PROCESSOR: Optional[Any] = None
 LLM_PROVIDER: Optional[Any] = None
 
+UPLOAD_CHUNK_SIZE = 64 * 1024
+MAX_UPLOAD_SIZE = 10 * 1024 * 1024
+UPLOAD_EXCERPT_HEAD = 8192
+UPLOAD_EXCERPT_TAIL = 2048
+# Items accepted by /analyze/batch, and how many of them run at once
+MAX_BATCH_SIZE = 32
+BATCH_CONCURRENCY = 8
+
 class AnalysisRequest(BaseModel):
     content: str
     log_type: str
@@ -44,10 +56,19 @@ class AnalysisResponse(BaseModel):
     recommendations: List[str]
     severity: str
 
+class BatchAnalysisRequest(BaseModel):
+    items: List[AnalysisRequest]
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize model and components on startup."""
-    global MODEL, TOKENIZER, PARSER, DATA_PROCESSOR, LLM_PROVIDER
+    global MODEL, TOKENIZER, PARSER, DATA_PROCESSOR, LLM_PROVIDER, MAX_UPLOAD_SIZE
+    global MAX_BATCH_SIZE, BATCH_CONCURRENCY
+
+    # Bound the worker pool used for blocking LLM/model calls
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+    )
 
     # Try multiple config paths
     config_path = None
@@ -62,7 +83,12 @@ async def startup_event():
         return
 
     with open(config_path) as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=_SafeLoader)
+
+    MAX_UPLOAD_SIZE = config.get("security", {}).get("max_request_size", MAX_UPLOAD_SIZE)
+    api_config = config.get("api", {})
+    MAX_BATCH_SIZE = api_config.get("max_batch_size", MAX_BATCH_SIZE)
+    BATCH_CONCURRENCY = api_config.get("batch_concurrency", BATCH_CONCURRENCY)
 
     # Initialize LLM provider from config
     llm_config = config.get("llm", {})
@@ -98,15 +124,29 @@ async def startup_event():
         try:
             tokenizer_path = Path(config["tokenizer"]["model_path"])
             if tokenizer_path.exists():
-                TOKENIZER = TokenizerWrapper(str(tokenizer_path))
-                MODEL = CyberLabSLM(
-                    vocab_size=TOKENIZER.vocab_size,
-                    **config["model"]
+                import torch
+                from slm.cyberlab.model import CyberLabSLM
+                from slm.cyberlab.preprocessing import (
+                    TokenizerWrapper, SecurityLogParser, DataProcessor
                 )
-                model_path = Path(config["model"]["weights_path"])
-                if model_path.exists():
-                    MODEL.load_state_dict(torch.load(model_path))
+
+                TOKENIZER = TokenizerWrapper(str(tokenizer_path))
+                MODEL = CyberLabSLM.from_config(TOKENIZER.vocab_size, config["model"])
                 MODEL.eval()
+                inference_config = config.get("inference", {})
+                if torch.cuda.is_available():
+                    torch.backends.cuda.matmul.allow_tf32 = True
+                    MODEL.to("cuda")
+                    # Compile in place and warm up so the first request
+                    # does not pay the compilation cost
+                    if inference_config.get("compile", False):
+                        MODEL.compile_for_inference()
+                        with torch.inference_mode():
+                            MODEL(torch.zeros(
+                                (1, MODEL.max_seq_length), dtype=torch.long, device="cuda"
+                            ))
+                elif inference_config.get("quantize_cpu", False):
+                    MODEL = MODEL.to_quantized()
                 PARSER = SecurityLogParser(config["parser"]["patterns_file"])
                 DATA_PROCESSOR = DataProcessor(TOKENIZER, config["model"]["max_seq_length"])
                 print("Local model initialized")
@@ -114,77 +154,134 @@ async def startup_event():
             print(f"Warning: Failed to initialize local model: {e}")
             MODEL = None
     
-    # Load analysis cache if available
-    cache_path = Path(config["cache"]["file_path"])
-    if cache_path.exists():
-        MODEL.load_cache(str(cache_path))
+    # Load analysis cache if available (load_cache also migrates legacy YAML)
+    if MODEL is not None:
+        MODEL.analysis_cache.maxsize = config["cache"].get("max_size", MODEL.analysis_cache.maxsize)
+        MODEL.load_cache(config["cache"]["file_path"])
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release pooled LLM provider connections."""
+    if LLM_PROVIDER is not None:
+        LLM_PROVIDER.close()
+        await LLM_PROVIDER.aclose()
+
+def _to_response(analysis: Dict[str, Any]) -> AnalysisResponse:
+    return AnalysisResponse(
+        analysis=analysis,
+        recommendations=analysis.get("recommendations", []),
+        severity=analysis.get("severity", "unknown")
+    )
+
+def _analyze_with_llm(request: AnalysisRequest) -> AnalysisResponse:
+    """Analyze a single request with the configured cloud LLM."""
+    response = LLM_PROVIDER.chat(
+        build_analysis_messages(request.log_type, request.content),
+        temperature=ANALYSIS_TEMPERATURE
+    )
+    return _llm_to_response(response)
+
+async def _aanalyze_with_llm(request: AnalysisRequest) -> AnalysisResponse:
+    """Analyze a single request with the LLM's async client."""
+    response = await LLM_PROVIDER.achat(
+        build_analysis_messages(request.log_type, request.content),
+        temperature=ANALYSIS_TEMPERATURE
+    )
+    return _llm_to_response(response)
+
+def _llm_to_response(response) -> AnalysisResponse:
+    """Build an AnalysisResponse from an LLM reply, parsing any embedded JSON."""
+    # Parse JSON from response
+    json_text = extract_json_object(response.content)
+    if json_text:
+        analysis = _json_loads(json_text)
+    else:
+        analysis = {
+            "severity": "unknown",
+            "findings": [response.content],
+            "recommendations": []
+        }
+
+    return _to_response(analysis)
+
+def _analyze_local(requests: List[AnalysisRequest]) -> List[AnalysisResponse]:
+    """Analyze requests with the local model, one analyze_security_log call per item."""
+    if not MODEL or not TOKENIZER or not PARSER:
+        raise HTTPException(status_code=500, detail="No model available")
+
+    import torch
+
+    # Reject log types the parser doesn't support
+    for request in requests:
+        if not hasattr(PARSER, f"parse_{request.log_type}_output"):
+            raise ValueError(f"Unsupported log type: {request.log_type}")
+
+    # Generate analysis
+    with torch.inference_mode(), torch.autocast(
+        "cuda", dtype=torch.bfloat16, enabled=torch.cuda.is_available()
+    ):
+        analyses = [MODEL.analyze_security_log(request.content) for request in requests]
+
+    return [_to_response(analysis) for analysis in analyses]
+
+def _llm_available() -> bool:
+    return bool(LLM_PROVIDER and LLM_PROVIDER.is_available())
+
+def _analyze_one(request: AnalysisRequest) -> AnalysisResponse:
+    # Try cloud LLM first
+    if _llm_available():
+        return _analyze_with_llm(request)
+
+    # Fall back to local model
+    return _analyze_local([request])[0]
 
 @app.post("/analyze", response_model=AnalysisResponse)
 async def analyze_log(request: AnalysisRequest):
     """Analyze security log content using cloud LLM or local model."""
     try:
-        # Try cloud LLM first
-        if LLM_PROVIDER and LLM_PROVIDER.is_available():
-            prompt = f"""You are a cybersecurity expert analyzing {request.log_type} scan results.
-
-Analyze the following log output and provide:
-1. Severity assessment (critical, high, medium, low, info)
-2. Key findings (list of security issues discovered)
-3. Recommendations (actionable steps to address issues)
-
-Log content:
-```{request.content}
-```
-
-Provide your analysis in JSON format:
-{{
-    "severity": "...",
-    "findings": ["..."],
-    "recommendations": ["..."]
-}}"""
-
-            response = LLM_PROVIDER.complete(prompt)
-
-            # Parse JSON from response
-            import re
-            json_match = re.search(r'\{[\s\S]*\}', response.content)
-            if json_match:
-                analysis = json.loads(json_match.group())
-            else:
-                analysis = {
-                    "severity": "unknown",
-                    "findings": [response.content],
-                    "recommendations": []
-                }
-
-            return AnalysisResponse(
-                analysis=analysis,
-                recommendations=analysis.get("recommendations", []),
-                severity=analysis.get("severity", "unknown")
-            )
+        # Blocking provider/model calls run off the event loop
+        return await asyncio.to_thread(_analyze_one, request)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Fall back to local model
-        if not MODEL or not TOKENIZER or not PARSER:
-            raise HTTPException(status_code=500, detail="No model available")
+@app.post("/analyze/batch", response_model=List[AnalysisResponse])
+async def analyze_batch(request: BatchAnalysisRequest):
+    """Analyze several security logs in one request.
 
-        # Parse log based on type
-        parsed_content = getattr(PARSER, f"parse_{request.log_type}_output")(request.content)
+    Up to BATCH_CONCURRENCY cloud LLM calls are issued at once; the local
+    model analyzes the items in turn in a single worker thread. Batches of
+    more than MAX_BATCH_SIZE items are rejected.
+    """
+    if len(request.items) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(request.items)} items (limit {MAX_BATCH_SIZE})"
+        )
 
-        # Prepare input for model
-        batch = DATA_PROCESSOR.prepare_batch([json.dumps(parsed_content)])
+    try:
+        if await asyncio.to_thread(_llm_available):
+            semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
 
-        # Generate analysis
-        with torch.no_grad():
-            analysis = MODEL.analyze_security_log(request.content)
+            async def analyze(item: AnalysisRequest) -> AnalysisResponse:
+                async with semaphore:
+                    return await _aanalyze_with_llm(item)
 
-        return AnalysisResponse(
-            analysis=analysis,
-            recommendations=analysis.get("recommendations", []),
-            severity=analysis.get("severity", "unknown")
-        )
+            return await asyncio.gather(*(analyze(item) for item in request.items))
+
+        return await asyncio.to_thread(_analyze_local, request.items)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def _upload_excerpt(data: bytearray) -> str:
+    """Decode the head and tail of an upload, eliding the middle of large files."""
+    if len(data) <= UPLOAD_EXCERPT_HEAD + UPLOAD_EXCERPT_TAIL:
+        return data.decode(errors="replace")
+    return (
+        data[:UPLOAD_EXCERPT_HEAD].decode(errors="replace")
+        + "\n...[truncated]...\n"
+        + data[-UPLOAD_EXCERPT_TAIL:].decode(errors="replace")
+    )
+
 @app.post("/analyze/file")
 async def analyze_file(
     file: UploadFile = File(...),
@@ -195,16 +292,21 @@ async def analyze_file(
     if not log_type:
         raise HTTPException(status_code=400, detail="Log type must be specified")
     
-    content = await file.read()
-    content = content.decode()
-    
-    request = AnalysisRequest(content=content, log_type=log_type)
+    # Read in chunks so oversized uploads are rejected before being fully buffered
+    buf = bytearray()
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        buf.extend(chunk)
+        if len(buf) > MAX_UPLOAD_SIZE:
+            raise HTTPException(status_code=413, detail="Uploaded file too large")
+
+    # Only the excerpt that is actually sent for analysis gets decoded
+    request = AnalysisRequest(content=_upload_excerpt(buf), log_type=log_type)
     return await analyze_log(request)
 
 @app.get("/health")
 async def health_check():
     """Check API health status."""
-    llm_available = LLM_PROVIDER and LLM_PROVIDER.is_available()
+    llm_available = await asyncio.to_thread(_llm_available)
     return {
         "status": "healthy",
         "model_loaded": MODEL is not None,
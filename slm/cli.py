@@ -1,18 +1,48 @@
 import click
-import torch
 from pathlib import Path
 from rich.console import Console
 from rich.progress import Progress
 import yaml
+import copy
+import functools
 import os
 import sys
 
-from slm.cyberlab.model import CyberLabSLM
-from slm.cyberlab.preprocessing import TokenizerWrapper, DataProcessor
 from slm.llm import LLMProvider
+from slm.llm.base import extract_json_object
+from slm.llm.prompts import ANALYSIS_TEMPERATURE, build_analysis_messages
 
 console = Console()
 
+try:
+    from yaml import CSafeLoader as _SafeLoader, CSafeDumper as _SafeDumper
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader, SafeDumper as _SafeDumper
+
+
+@functools.lru_cache(maxsize=8)
+def _load_yaml(path: str, mtime: float) -> dict:
+    with open(path) as f:
+        return yaml.load(f, Loader=_SafeLoader)
+
+
+def load_config(path) -> dict:
+    """Load a YAML config file, parsing it at most once per modification."""
+    path = str(path)
+    # Callers mutate the result, so hand out a copy of the cached dict
+    return copy.deepcopy(_load_yaml(path, os.path.getmtime(path)))
+
+
+@functools.lru_cache(maxsize=8)
+def _load_parser(patterns_file: str, mtime: float):
+    from slm.cyberlab.preprocessing import SecurityLogParser
+    return SecurityLogParser(patterns_file)
+
+
+def get_parser(patterns_file: str):
+    """Return a SecurityLogParser for patterns_file, reused until the file changes."""
+    return _load_parser(patterns_file, os.path.getmtime(patterns_file))
+
 
 def load_llm_provider(config: dict, provider: str = None, api_key: str = None,
                       model: str = None, offline: bool = False):
@@ -78,8 +108,7 @@ def cli(ctx, config, provider, api_key, model, offline):
     # Load configuration
     config_path = Path(config)
     if config_path.exists():
-        with open(config_path) as f:
-            ctx.obj = yaml.safe_load(f)
+        ctx.obj = load_config(config_path)
     else:
         console.print(f"[yellow]Warning: Config file not found at {config}, using defaults[/]")
         ctx.obj = {}
@@ -88,6 +117,8 @@ def cli(ctx, config, provider, api_key, model, offline):
     ctx.obj['llm_provider'] = load_llm_provider(
         ctx.obj, provider, api_key, model, offline
     )
+    if ctx.obj['llm_provider'] is not None:
+        ctx.call_on_close(ctx.obj['llm_provider'].close)
     ctx.obj['offline_mode'] = offline
     ctx.obj['config_path'] = config
 
@@ -98,6 +129,8 @@ def cli(ctx, config, provider, api_key, model, offline):
 @click.option('--vocab-size', '-v', type=int, default=8000)
 def train_tokenizer(input_file, model_config, output_dir, vocab_size):
     """Train a new tokenizer model."""
+    from slm.cyberlab.preprocessing import TokenizerWrapper
+
     with console.status("[bold green]Training tokenizer..."):
         output_dir = Path(output_dir)
         output_dir.mkdir(parents=True, exist_ok=True)
@@ -110,14 +143,13 @@ def train_tokenizer(input_file, model_config, output_dir, vocab_size):
         # Update config if it exists
         config_path = Path(model_config)
         if config_path.exists():
-            with open(config_path) as f:
-                config = yaml.safe_load(f)
+            config = load_config(config_path)
 
             config['tokenizer']['model_path'] = str(model_prefix) + ".model"
             config['tokenizer']['vocab_size'] = vocab_size
 
             with open(config_path, 'w') as f:
-                yaml.dump(config, f)
+                yaml.dump(config, f, Dumper=_SafeDumper)
         else:
             console.print(f"[yellow]Warning: Config file not found at {model_config}[/]")
 
@@ -131,23 +163,33 @@ def train_tokenizer(input_file, model_config, output_dir, vocab_size):
 @click.option('--learning-rate', '-lr', type=float, default=5e-5)
 def train_model(train_file, model_config, epochs, batch_size, learning_rate):
     """Train the CyberLab SLM model."""
+    import torch
+    from slm.cyberlab.model import CyberLabSLM
+    from slm.cyberlab.preprocessing import TokenizerWrapper, DataProcessor
+
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
     
     # Load configuration
-    with open(model_config) as f:
-        config = yaml.safe_load(f)
+    config = load_config(model_config)
     
     # Initialize components
     tokenizer = TokenizerWrapper(config['tokenizer']['model_path'])
-    model = CyberLabSLM(vocab_size=tokenizer.vocab_size, **config['model'])
+    model = CyberLabSLM.from_config(tokenizer.vocab_size, config['model'], load=False)
     model.to(device)
     
     optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
     processor = DataProcessor(tokenizer, config['model']['max_seq_length'])
     
-    # Load training data
+    # Load training data and tokenize it once up front, not every epoch
     with open(train_file) as f:
-        train_data = f.readlines()
+        # Blank lines tokenize to fully padded rows, which attention can't handle
+        train_data = [line for line in f if line.strip()]
+    dataset = processor.prepare_dataset(train_data)
+    loader = torch.utils.data.DataLoader(
+        dataset,
+        batch_size=batch_size,
+        pin_memory=device.type == "cuda",
+    )
     
     with Progress() as progress:
         epoch_task = progress.add_task("[red]Epochs...", total=epochs)
@@ -155,24 +197,26 @@ def train_model(train_file, model_config, epochs, batch_size, learning_rate):
         for epoch in range(epochs):
             batch_task = progress.add_task(f"[green]Epoch {epoch + 1}...", total=len(train_data))
             
-            for i in range(0, len(train_data), batch_size):
-                batch_texts = train_data[i:i + batch_size]
-                batch = processor.prepare_batch(batch_texts)
-                
-                # Move batch to device
-                inputs = {k: v.to(device) for k, v in batch.items()}
+            for input_ids, attention_mask in loader:
+                # Move batch to device, overlapping the copy with compute
+                input_ids = input_ids.to(device, non_blocking=True)
+                padding_mask = attention_mask.to(device, non_blocking=True) == 0
                 
-                # Forward pass
-                outputs = model(**inputs)
-                loss = torch.nn.functional.cross_entropy(outputs.view(-1, tokenizer.vocab_size), 
-                                                       inputs['input_ids'].view(-1))
+                # Forward pass; padded positions are masked out of attention
+                # and excluded from the loss
+                with torch.autocast("cuda", dtype=torch.bfloat16, enabled=device.type == "cuda"):
+                    outputs = model(input_ids, src_key_padding_mask=padding_mask)
+                    loss = torch.nn.functional.cross_entropy(
+                        outputs.reshape(-1, tokenizer.vocab_size).float(),
+                        input_ids.masked_fill(padding_mask, -100).view(-1)
+                    )
                 
                 # Backward pass
                 optimizer.zero_grad()
                 loss.backward()
                 optimizer.step()
                 
-                progress.update(batch_task, advance=len(batch_texts))
+                progress.update(batch_task, advance=len(input_ids))
             
             progress.update(epoch_task, advance=1)
     
@@ -190,53 +234,36 @@ def train_model(train_file, model_config, epochs, batch_size, learning_rate):
 @click.pass_context
 def analyze(ctx, input_file, log_type, model_config):
     """Analyze a security log file using cloud LLM."""
-    from slm.cyberlab.preprocessing import SecurityLogParser
-
     # Get config from context
     cli_config = ctx.obj
     llm_provider = cli_config.get('llm_provider')
     offline_mode = cli_config.get('offline_mode', False)
 
     # Load configuration
-    with open(model_config) as f:
-        config = yaml.safe_load(f)
+    config = load_config(model_config)
 
     # If LLM provider is available, use it for enhanced analysis
     if llm_provider and llm_provider.is_available():
         with open(input_file) as f:
             content = f.read()
 
-        # Build prompt for the LLM
-        prompt = f"""You are a cybersecurity expert analyzing {log_type} scan results.
-
-Analyze the following log output and provide:
-1. Severity assessment (critical, high, medium, low, info)
-2. Key findings (list of security issues discovered)
-3. Recommendations (actionable steps to address issues)
-
-Log content:
-```{content}
-```
-
-Provide your analysis in JSON format:
-{{
-    "severity": "...",
-    "findings": ["..."],
-    "recommendations": ["..."]
-}}"""
+        # Build messages for the LLM
+        messages = build_analysis_messages(log_type, content)
 
         with console.status("[bold green]Analyzing with cloud LLM..."):
             try:
-                response = llm_provider.complete(prompt)
+                response = llm_provider.chat(messages, temperature=ANALYSIS_TEMPERATURE)
 
                 # Try to parse JSON from response
-                import json
-                import re
+                try:
+                    from orjson import loads as json_loads
+                except ImportError:
+                    from json import loads as json_loads
 
                 # Extract JSON from response
-                json_match = re.search(r'\{[\s\S]*\}', response.content)
-                if json_match:
-                    analysis = json.loads(json_match.group())
+                json_text = extract_json_object(response.content)
+                if json_text:
+                    analysis = json_loads(json_text)
                 else:
                     # Fallback if JSON parsing fails
                     analysis = {
@@ -272,7 +299,6 @@ Provide your analysis in JSON format:
 
 def _analyze_local(config, input_file, log_type):
     """Fallback to local model analysis."""
-    from slm.cyberlab.model import CyberLabSLM as LocalCyberLabSLM
 
     # Check if tokenizer model exists
     tokenizer_path = config.get('tokenizer', {}).get('model_path', 'models/cyberlab_tokenizer.model')
@@ -283,21 +309,27 @@ def _analyze_local(config, input_file, log_type):
             "recommendations": ["Run 'cyberlab train-tokenizer' to train the tokenizer", "Or use cloud LLM provider"]
         }
 
-    tokenizer = TokenizerWrapper(tokenizer_path)
-    model = LocalCyberLabSLM(vocab_size=tokenizer.vocab_size, **config['model'])
+    import torch
+    from slm.cyberlab.model import CyberLabSLM
+    from slm.cyberlab.preprocessing import TokenizerWrapper
 
-    weights_path = Path(config['model']['weights_path'])
-    if weights_path.exists():
-        model.load_state_dict(torch.load(weights_path))
+    tokenizer = TokenizerWrapper(tokenizer_path)
+    model = CyberLabSLM.from_config(tokenizer.vocab_size, config['model'])
     model.eval()
+    if torch.cuda.is_available():
+        torch.backends.cuda.matmul.allow_tf32 = True
+        model.to("cuda")
 
-    parser = SecurityLogParser(config['parser']['patterns_file'])
+    parser = get_parser(config['parser']['patterns_file'])
 
     with open(input_file) as f:
         content = f.read()
 
     parsed_content = getattr(parser, f"parse_{log_type}_output")(content)
-    return model.analyze_security_log(content)
+    with torch.inference_mode(), torch.autocast(
+        "cuda", dtype=torch.bfloat16, enabled=torch.cuda.is_available()
+    ):
+        return model.analyze_security_log(content)
 
 if __name__ == '__main__':
     cli()
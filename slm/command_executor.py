@@ -1,16 +1,171 @@
 from rich.console import Console
 from rich.syntax import Syntax
 from rich.panel import Panel
+from rich.text import Text
+import functools
+import glob
+import re
 import subprocess
 import shlex
 import os
 import sys
-from typing import Optional, Dict, Any, List
+import threading
+from bisect import bisect_right
+from typing import Optional, Dict, Any, List, IO, Tuple, FrozenSet, Iterable
 import json
 
 # Import platform utilities
 from slm.platform import is_windows, get_shell
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# List of dangerous commands/patterns
+DANGEROUS_PATTERNS = (
+    "rm -rf",
+    "del /f",
+    "format",
+    ">",  # redirections
+    "2>",
+    "&",  # command chaining
+    "|",  # pipes
+    ";",  # command separator
+    "mkfs",
+    "dd"
+)
+
+
+def _build_danger_automaton():
+    """Compile DANGEROUS_PATTERNS into an Aho-Corasick automaton if available."""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for pattern in DANGEROUS_PATTERNS:
+        automaton.add_word(pattern, pattern)
+    automaton.make_automaton()
+    return automaton
+
+
+_DANGER_AUTOMATON = _build_danger_automaton()
+
+# Builtins that only exist inside a shell; with commands spawned directly on
+# POSIX they have no executable to run (or no effect on this process)
+SHELL_BUILTINS = frozenset({
+    ".", "alias", "bg", "cd", "eval", "exec", "exit", "export", "fg", "hash",
+    "jobs", "popd", "pushd", "read", "set", "shift", "source", "trap", "type",
+    "ulimit", "umask", "unalias", "unset", "wait",
+})
+
+# One lexical piece of a POSIX shell word: '...', "...", a backslash escape,
+# a run of plain characters, or the whitespace between words
+_SHELL_TOKEN = re.compile(
+    r"""'([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.)|([^\s'"\\]+)|(\s+)""", re.DOTALL
+)
+_DOUBLE_QUOTE_ESCAPE = re.compile(r'\\([$`"\\\n])')
+
+
+def _expand_word(segments: List[Tuple[str, str]]) -> List[str]:
+    """Expand one shell word given as (text, quoting) segments.
+    
+    Quoting is "plain", "double" or "literal" (single-quoted or escaped).
+    As in sh, ~ expands at the start of an unquoted word, $VAR outside single
+    quotes, and glob patterns only in unquoted text; a pattern that matches
+    nothing is passed through unchanged. Unlike sh, expanded values are not
+    field-split, so a variable always stays one argument.
+    """
+    texts: List[str] = []
+    pattern: List[str] = []
+    magic = False
+    for i, (text, quoting) in enumerate(segments):
+        if quoting == "plain" and i == 0 and text.startswith("~"):
+            text = os.path.expanduser(text)
+        if quoting != "literal":
+            text = os.path.expandvars(text)
+        if quoting == "plain":
+            magic = magic or any(c in text for c in "*?[")
+            pattern.append(text)
+        else:
+            pattern.append(glob.escape(text))
+        texts.append(text)
+    
+    if magic:
+        matches = sorted(glob.glob("".join(pattern)))
+        if matches:
+            return matches
+    return ["".join(texts)]
+
+
+def _expand_argv(command: str) -> List[str]:
+    """Split ``command`` into argv like a POSIX shell, expanding ~, $VAR and globs.
+    
+    Raises:
+        ValueError: If a quotation is not closed
+    """
+    argv: List[str] = []
+    word: Optional[List[Tuple[str, str]]] = None
+    pos = 0
+    for match in _SHELL_TOKEN.finditer(command):
+        if match.start() != pos:
+            raise ValueError("No closing quotation")
+        pos = match.end()
+        single, double, escaped, plain, space = match.groups()
+        if space is not None:
+            if word is not None:
+                argv.extend(_expand_word(word))
+                word = None
+            continue
+        if word is None:
+            word = []
+        if single is not None:
+            word.append((single, "literal"))
+        elif double is not None:
+            word.append((_DOUBLE_QUOTE_ESCAPE.sub(r"\1", double), "double"))
+        elif escaped is not None:
+            word.append((escaped, "literal"))
+        else:
+            word.append((plain, "plain"))
+    if pos != len(command):
+        raise ValueError("No closing quotation")
+    if word is not None:
+        argv.extend(_expand_word(word))
+    return argv
+
+
+# Output capture limits for executed commands
+OUTPUT_CHUNK_SIZE = 64 * 1024
+MAX_OUTPUT_BYTES = 64 * 1024 * 1024
+
+
+def _read_bounded(stream: IO[bytes], limit: int, on_overflow) -> Tuple[bytearray, bool]:
+    """Read a pipe in fixed-size chunks, stopping once ``limit`` bytes are held."""
+    buffer = bytearray()
+    for chunk in iter(lambda: stream.read(OUTPUT_CHUNK_SIZE), b""):
+        if len(buffer) + len(chunk) > limit:
+            buffer += chunk[:limit - len(buffer)]
+            on_overflow()
+            return buffer, True
+        buffer += chunk
+    return buffer, False
+
+
+def _decode_output(buffer: bytearray) -> str:
+    """Strip and decode captured output in one pass."""
+    return buffer.strip().decode(errors="replace")
+
+
+# Shared console for all executors
+_CONSOLE = Console()
+
+
+@functools.lru_cache(maxsize=256)
+def _highlight_command(command: str) -> Text:
+    """Pygments-highlight a command once; repeated commands reuse the Text."""
+    text = Syntax(command, "bash", theme="monokai").highlight(command)
+    text.rstrip()
+    return text
+
 class CommandFormatter:
     """Format and validate system commands."""
 
@@ -26,21 +181,11 @@ class CommandFormatter:
     @staticmethod
     def validate_command(command: str) -> bool:
         """Validate if a command is safe to execute."""
-        # List of dangerous commands/patterns
-        dangerous_patterns = [
-            "rm -rf",
-            "del /f",
-            "format",
-            ">",  # redirections
-            "2>",
-            "&",  # command chaining
-            "|",  # pipes
-            ";",  # command separator
-            "mkfs",
-            "dd"
-        ]
-        
-        return not any(pattern in command.lower() for pattern in dangerous_patterns)
+        lowered = command.lower()
+        if _DANGER_AUTOMATON is not None:
+            # Single pass over the command for all patterns at once
+            return next(_DANGER_AUTOMATON.iter(lowered), None) is None
+        return not any(pattern in lowered for pattern in DANGEROUS_PATTERNS)
 
 class SecurityContext:
     """Manage security context for command execution."""
@@ -50,29 +195,61 @@ class SecurityContext:
         self.allowed_commands: List[str] = []
         self.security_level: str = "strict"
     
+    @property
+    def allowed_paths(self) -> Tuple[str, ...]:
+        return self._allowed_paths
+    
+    @allowed_paths.setter
+    def allowed_paths(self, paths: Iterable[str]) -> None:
+        self._allowed_paths = tuple(paths)
+        # Keep only prefixes not covered by a shorter allowed prefix; in a
+        # prefix-free sorted list the only candidate for a path is its
+        # bisect predecessor.
+        prefixes: List[str] = []
+        for allowed in sorted(self._allowed_paths):
+            if not prefixes or not allowed.startswith(prefixes[-1]):
+                prefixes.append(allowed)
+        self._sorted_prefixes = prefixes
+    
+    @property
+    def allowed_commands(self) -> FrozenSet[str]:
+        return self._allowed_commands
+    
+    @allowed_commands.setter
+    def allowed_commands(self, commands: Iterable[str]) -> None:
+        # Stored as a frozenset so membership checks are O(1)
+        self._allowed_commands = frozenset(commands)
+    
     def is_command_allowed(self, command: str) -> bool:
         """Check if a command is allowed in current security context."""
-        cmd = shlex.split(command)[0]
+        # Plain alphanumeric program names need no shell-style tokenizing
+        first = command.split(None, 1)
+        if first and first[0].isascii() and first[0].isalnum():
+            cmd = first[0]
+        else:
+            cmd = shlex.split(command)[0]
         return (
-            cmd in self.allowed_commands or
+            cmd in self._allowed_commands or
             self.security_level == "permissive"
         )
     
     def is_path_allowed(self, path: str) -> bool:
         """Check if a path is allowed in current security context."""
         path = os.path.abspath(path)
+        idx = bisect_right(self._sorted_prefixes, path) - 1
         return (
-            any(path.startswith(allowed) for allowed in self.allowed_paths) or
+            (idx >= 0 and path.startswith(self._sorted_prefixes[idx])) or
             self.security_level == "permissive"
         )
 
 class CommandExecutor:
     """Execute system commands safely."""
     
-    def __init__(self):
-        self.console = Console()
+    def __init__(self, max_output_bytes: int = MAX_OUTPUT_BYTES):
+        self.console = _CONSOLE
         self.formatter = CommandFormatter()
         self.security = SecurityContext()
+        self.max_output_bytes = max_output_bytes
     
     def execute(self, command: str) -> Dict[str, Any]:
         """Execute a system command and return results."""
@@ -94,10 +271,25 @@ class CommandExecutor:
             }
         
         try:
+            # validate_command already rejects redirections, pipes and
+            # separators, so on POSIX the argv is spawned directly
+            # (posix_spawn/vfork) rather than forking a shell; ~, $VAR and
+            # globs are expanded here instead. Windows keeps the shell
+            # because dir/type/del are cmd.exe builtins.
+            if is_windows():
+                args, use_shell = formatted_cmd, True
+            else:
+                args, use_shell = _expand_argv(formatted_cmd), False
+                if args and args[0] in SHELL_BUILTINS:
+                    return {
+                        "success": False,
+                        "error": f"'{args[0]}' is a shell builtin and can't be run as a command"
+                    }
+            
             # Display command
             self.console.print(
                 Panel(
-                    Syntax(formatted_cmd, "bash", theme="monokai"),
+                    _highlight_command(formatted_cmd),
                     title="Executing Command",
                     border_style="blue"
                 )
@@ -105,23 +297,47 @@ class CommandExecutor:
             
             # Execute command
             process = subprocess.Popen(
-                formatted_cmd,
-                shell=True,
+                args,
+                shell=use_shell,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                bufsize=-1
             )
             
-            # Capture output
-            stdout, stderr = process.communicate()
+            # Stream both pipes into capped buffers; stderr is drained on a
+            # helper thread so a full pipe can't deadlock the child.
+            stderr_result: List[Tuple[bytearray, bool]] = []
+            stderr_reader = threading.Thread(
+                target=lambda: stderr_result.append(
+                    _read_bounded(process.stderr, self.max_output_bytes, process.kill)
+                ),
+                daemon=True
+            )
+            stderr_reader.start()
+            stdout_buf, stdout_truncated = _read_bounded(
+                process.stdout, self.max_output_bytes, process.kill
+            )
+            stderr_reader.join()
+            stderr_buf, stderr_truncated = stderr_result[0]
+            process.stdout.close()
+            process.stderr.close()
+            process.wait()
+            
+            stdout = _decode_output(stdout_buf)
+            stderr = _decode_output(stderr_buf)
             
             # Format result
             result = {
                 "success": process.returncode == 0,
                 "return_code": process.returncode,
-                "stdout": stdout.strip(),
-                "stderr": stderr.strip() if stderr else None
+                "stdout": stdout,
+                "stderr": stderr if stderr else None
             }
+            if stdout_truncated or stderr_truncated:
+                result["success"] = False
+                result["error"] = (
+                    f"Command output exceeded {self.max_output_bytes} bytes and was truncated"
+                )
             
             # Display output
             if result["success"]:
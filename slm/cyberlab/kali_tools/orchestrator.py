@@ -1,9 +1,26 @@
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterator, List, Any, Optional, Union
 import json
+import os
+import tempfile
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 import yaml
 from datetime import datetime
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+# Parsed workflows.yaml, stored as JSON (loads far faster than YAML and,
+# unlike pickle, can't execute code) outside the possibly read-only package
+WORKFLOWS_CACHE = Path.home() / ".cache" / "cybershield" / "workflows.json"
+
+# Steps mostly wait on tool subprocesses and the network, so allow a few
+# more concurrent steps than cores (the ThreadPoolExecutor default)
+WORKFLOW_MAX_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
 class KaliToolOrchestrator:
     """Orchestrate and combine Kali Linux tools for comprehensive security analysis."""
     
@@ -28,14 +45,51 @@ class KaliToolOrchestrator:
         
         # Load workflows
         self.workflows = self._load_workflows()
+        
+        # Workflow step handlers keyed by tool name
+        self._dispatch = {
+            "nmap": lambda target, opts, step: self.info_gathering.nmap_scan(target, opts),
+            "nikto": lambda target, opts, step: self.web_analysis.nikto_scan(target, opts),
+            "sqlmap": lambda target, opts, step: self.web_analysis.sqlmap_scan(target, opts),
+            "hydra": lambda target, opts, step: self.password_attacks.hydra_attack(
+                target, step.get("service", "http-post-form"), opts
+            ),
+            "metasploit": lambda target, opts, step: self.exploitation.metasploit_exploit(
+                step.get("module", ""), dict(opts)
+            ),
+        }
     
     def _load_workflows(self) -> Dict[str, Any]:
         """Load predefined security workflows."""
         workflow_path = Path(__file__).parent / "workflows.yaml"
-        if workflow_path.exists():
-            with open(workflow_path) as f:
-                return yaml.safe_load(f)
-        return {}
+        try:
+            yaml_mtime = workflow_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return {}
+        
+        # Reuse the cached parse while it was made from this exact file version
+        try:
+            with open(WORKFLOWS_CACHE, encoding="utf-8") as f:
+                cached = json.load(f)
+            if cached["source"] == str(workflow_path) and cached["mtime_ns"] == yaml_mtime:
+                return cached["workflows"]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        
+        with open(workflow_path) as f:
+            workflows = yaml.load(f, Loader=_SafeLoader)
+        try:
+            WORKFLOWS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=WORKFLOWS_CACHE.parent, suffix=".tmp", delete=False
+            ) as f:
+                json.dump({"source": str(workflow_path), "mtime_ns": yaml_mtime,
+                           "workflows": workflows}, f)
+            os.replace(f.name, WORKFLOWS_CACHE)
+        except OSError:
+            # Unwritable cache directory; fall back to parsing YAML each time
+            pass
+        return workflows
     
     def execute_workflow(self, 
                         workflow_name: str, 
@@ -57,14 +111,7 @@ class KaliToolOrchestrator:
         }
         
         try:
-            for step in workflow["steps"]:
-                step_result = self._execute_workflow_step(step, target, options)
-                results["steps"].append({
-                    "name": step["name"],
-                    "tool": step["tool"],
-                    "result": step_result
-                })
-                
+            self._run_steps(workflow["steps"], target, options, results)
             return {
                 "success": True,
                 "results": results
@@ -77,29 +124,74 @@ class KaliToolOrchestrator:
                 "partial_results": results
             }
     
+    def _run_steps(self,
+                   steps: List[Dict[str, Any]],
+                   target: str,
+                   options: Optional[Dict[str, Any]],
+                   results: Dict[str, Any]) -> None:
+        """Run workflow steps, overlapping those that are allowed to run concurrently.
+        
+        By default each step waits for the one before it, so workflows run
+        in order. A step marked ``parallel: true`` starts without waiting for
+        its predecessor, and an explicit ``depends_on`` list of step names
+        replaces the implicit ordering. Each tool runs as its own subprocess,
+        so threads suffice. Finished steps are recorded in workflow order,
+        including when a step raises.
+        """
+        names = [step.get("name", "unnamed_step") for step in steps]
+        dependencies = {}
+        for idx, step in enumerate(steps):
+            if "depends_on" in step:
+                dependencies[idx] = step["depends_on"]
+            elif idx and not step.get("parallel", False):
+                dependencies[idx] = [names[idx - 1]]
+            else:
+                dependencies[idx] = []
+        pending = dict(enumerate(steps))
+        finished_names = set()
+        outcomes: Dict[int, Dict[str, Any]] = {}
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, min(len(steps), WORKFLOW_MAX_WORKERS))) as pool:
+                running = {}
+                while pending or running:
+                    for idx, step in list(pending.items()):
+                        if finished_names.issuperset(dependencies[idx]):
+                            future = pool.submit(self._execute_workflow_step, step, target, options)
+                            running[future] = idx
+                            del pending[idx]
+                    if not running:
+                        blocked = ", ".join(names[idx] for idx in pending)
+                        raise ValueError(f"Unsatisfiable depends_on for steps: {blocked}")
+                    
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        idx = running.pop(future)
+                        outcomes[idx] = future.result()
+                        finished_names.add(names[idx])
+        finally:
+            for idx in sorted(outcomes):
+                results["steps"].append({
+                    "name": names[idx],
+                    "tool": steps[idx]["tool"],
+                    "result": outcomes[idx]
+                })
+    
     def _execute_workflow_step(self,
                              step: Dict[str, Any],
                              target: str,
                              options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Execute a single step in a workflow."""
         tool = step["tool"]
-        tool_options = step.get("options", [])
+        # Copy so per-run options don't accumulate in the loaded workflow
+        tool_options = list(step.get("options", []))
         
         if options and step["name"] in options:
             tool_options.extend(options[step["name"]])
         
-        if tool == "nmap":
-            return self.info_gathering.nmap_scan(target, tool_options)
-        elif tool == "nikto":
-            return self.web_analysis.nikto_scan(target, tool_options)
-        elif tool == "sqlmap":
-            return self.web_analysis.sqlmap_scan(target, tool_options)
-        elif tool == "hydra":
-            service = step.get("service", "http-post-form")
-            return self.password_attacks.hydra_attack(target, service, tool_options)
-        elif tool == "metasploit":
-            module = step.get("module", "")
-            return self.exploitation.metasploit_exploit(module, dict(tool_options))
+        handler = self._dispatch.get(tool)
+        if handler is not None:
+            return handler(target, tool_options, step)
         
         return {
             "success": False,
@@ -119,14 +211,7 @@ class KaliToolOrchestrator:
         }
         
         try:
-            for step in steps:
-                step_result = self._execute_workflow_step(step, target, options)
-                results["steps"].append({
-                    "name": step.get("name", "unnamed_step"),
-                    "tool": step["tool"],
-                    "result": step_result
-                })
-                
+            self._run_steps(steps, target, options, results)
             return {
                 "success": True,
                 "results": results
@@ -190,10 +275,28 @@ class KaliToolOrchestrator:
             "low_risks": 0
         }
         
-        # TODO: Implement summary generation logic
+        # Single pass over step results; outcomes are tallied in C by Counter
+        outcomes = Counter(
+            bool(step.get("result", {}).get("success")) for step in self._iter_steps(results)
+        )
+        summary["successful_steps"] = outcomes[True]
+        summary["failed_steps"] = outcomes[False]
+        summary["total_steps"] = outcomes[True] + outcomes[False]
+        
+        # TODO: Derive risk counts once findings extraction is implemented
         
         return summary
     
+    @staticmethod
+    def _iter_steps(results: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+        """Yield step records from a workflow result or a combined report."""
+        for workflow in results.get("workflows", [results]):
+            if "steps" not in workflow:
+                # execute_workflow() nests steps under "results", or
+                # "partial_results" when a step raised
+                workflow = workflow.get("results") or workflow.get("partial_results") or {}
+            yield from workflow.get("steps", [])
+    
     def _extract_findings(self, results: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Extract and categorize findings from results."""
         findings = []
@@ -1,17 +1,161 @@
 from typing import Dict, List, Any, Optional
+import atexit
+import functools
+import queue
 import re
+import subprocess
+import threading
+import time
+import uuid
 from datetime import datetime
 import json
 
+# Output parsing patterns, compiled once per process
+# Hosts and ports share one alternation so nmap output is scanned once
+_NMAP_RE = re.compile(
+    r"^(?:(?P<host>Nmap scan report for (?P<hostname>[\w.-]+)(?:[ \t]+\((?P<ip>[\d.]+)\))?)"
+    r"|(?P<port>(?P<portid>\d+)/(?P<proto>\w+)[ \t]+(?P<state>\S+)[ \t]+(?P<service>\S+)"
+    r"(?:[ \t]+(?P<info>[^\n]+))?))",
+    re.MULTILINE
+)
+_TECH_RE = re.compile(r"\[([^\]\n]*)\]")
+_NIKTO_RE = re.compile(r"\+ (.*?):\s+(.*)")
+_HYDRA_CRED_RE = re.compile(r"(\w+)://(\w+):(\w+)@([\w.-]+)")
+_MSF_SESSION_RE = re.compile(r"Session (\d+) created")
+_AIRCRACK_KEY_RE = re.compile(r"KEY FOUND! \[ (.*?) \]")
+
+# msfconsole splits input lines on ";" and hands unknown commands to the
+# shell, so these characters would let one command smuggle in others
+_MSF_UNSAFE_RE = re.compile(r"[;\x00-\x1f\x7f]")
+_MSF_MODULE_RE = re.compile(r"[\w/]+")
+_MSF_OPTION_RE = re.compile(r"\w+")
+
+_SQLMAP_INJECTION_MARKER = "sqlmap identified the following injection point"
+
+# Seconds a batch of msfconsole commands may run before the console is killed
+MSF_COMMAND_TIMEOUT = 300.0
+
+@functools.lru_cache(maxsize=1)
+def _get_manager():
+    """Return the process-wide KaliToolManager.
+    
+    The manager re-resolves its tool paths when a lookup misses, so tools
+    installed while the process runs are still found.
+    """
+    from .tool_manager import KaliToolManager
+
+    return KaliToolManager()
+
+class _MSFConsoleSession:
+    """A long-lived msfconsole process fed commands over stdin.
+
+    Starting msfconsole boots a Ruby VM and the module cache, which takes
+    several seconds; keeping one console around lets workflow steps reuse it.
+    """
+    
+    def __init__(self, msfconsole_path: str):
+        self.msfconsole_path = msfconsole_path
+        self._process: Optional[subprocess.Popen] = None
+        self._lines: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+    
+    def _ensure_running(self) -> subprocess.Popen:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(
+                [self.msfconsole_path, "-q"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            )
+            # Output is read on a helper thread so run() can wait with a deadline
+            self._lines = queue.Queue()
+            threading.Thread(
+                target=self._pump, args=(self._process.stdout, self._lines), daemon=True
+            ).start()
+        return self._process
+    
+    @staticmethod
+    def _pump(stdout, lines: "queue.Queue[Optional[str]]") -> None:
+        for line in iter(stdout.readline, ""):
+            lines.put(line)
+        lines.put(None)
+    
+    def _kill(self) -> None:
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+    
+    def run(self, commands: List[str], timeout: float = MSF_COMMAND_TIMEOUT) -> str:
+        """Run console commands and return their combined output.
+        
+        Each batch starts from the console's root context with its datastore
+        cleared, so options set by an earlier batch can't leak into this one.
+        
+        Raises:
+            ValueError: If a command contains ``;``, a line break or another
+                control character, which would let it inject further console
+                (or shell) commands
+            RuntimeError: If msfconsole exits, or the batch doesn't finish
+                within ``timeout`` seconds (the console is then killed and
+                restarted by the next batch)
+        """
+        if any(_MSF_UNSAFE_RE.search(command) for command in commands):
+            raise ValueError("msfconsole commands must not contain ';' or control characters")
+        
+        with self._lock:
+            process = self._ensure_running()
+            # msfconsole runs unknown commands through the system shell, so an
+            # echoed sentinel marks where this batch's output ends.
+            sentinel = f"__cybershield_{uuid.uuid4().hex}__"
+            batch = ["back", "unset all"] + commands + [f"echo {sentinel}"]
+            process.stdin.write("\n".join(batch) + "\n")
+            process.stdin.flush()
+            
+            deadline = time.monotonic() + timeout
+            lines = []
+            while True:
+                try:
+                    line = self._lines.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    self._kill()
+                    raise RuntimeError(f"msfconsole timed out after {timeout:g}s") from None
+                if line is None:
+                    self._process = None
+                    raise RuntimeError("msfconsole exited unexpectedly")
+                if sentinel in line:
+                    if line.strip() == sentinel:
+                        break
+                    continue  # the "[*] exec: echo ..." banner
+                lines.append(line)
+            return "".join(lines)
+    
+    def close(self) -> None:
+        with self._lock:
+            if self._process is not None and self._process.poll() is None:
+                try:
+                    self._process.stdin.write("exit -y\n")
+                    self._process.stdin.flush()
+                    self._process.wait(timeout=10)
+                except (OSError, subprocess.TimeoutExpired):
+                    self._process.kill()
+            self._process = None
+
+@functools.lru_cache(maxsize=None)
+def _get_msf_session(msfconsole_path: str) -> _MSFConsoleSession:
+    return _MSFConsoleSession(msfconsole_path)
+
 class InfoGathering:
     """Information Gathering Tools Handler."""
     
     @staticmethod
     def nmap_scan(target: str, options: List[str]) -> Dict[str, Any]:
         """Execute and parse Nmap scan."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
+        timestamp = datetime.now().isoformat()
+        manager = _get_manager()
         result = manager.execute_tool("nmap", [target] + options)
         
         if not result["success"]:
@@ -19,7 +163,7 @@ class InfoGathering:
             
         # Parse Nmap output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "target": target,
             "hosts": [],
             "ports": [],
@@ -28,26 +172,22 @@ class InfoGathering:
         
         output = result["output"]
         
-        # Parse hosts
-        host_pattern = r"Nmap scan report for ([\w.-]+)(?:\s+\(([\d.]+)\))?"
-        for match in re.finditer(host_pattern, output):
-            hostname, ip = match.groups()
-            parsed["hosts"].append({
-                "hostname": hostname,
-                "ip": ip or hostname
-            })
-        
-        # Parse ports
-        port_pattern = r"(\d+)/(\w+)\s+(\w+)\s+(\w+)(?:\s+(.+))?"
-        for match in re.finditer(port_pattern, output):
-            port, proto, state, service, info = match.groups()
-            parsed["ports"].append({
-                "port": int(port),
-                "protocol": proto,
-                "state": state,
-                "service": service,
-                "info": info
-            })
+        # Parse hosts and ports in a single pass
+        for match in _NMAP_RE.finditer(output):
+            if match.lastgroup == "host":
+                hostname = match.group("hostname")
+                parsed["hosts"].append({
+                    "hostname": hostname,
+                    "ip": match.group("ip") or hostname
+                })
+            else:
+                parsed["ports"].append({
+                    "port": int(match.group("portid")),
+                    "protocol": match.group("proto"),
+                    "state": match.group("state"),
+                    "service": match.group("service"),
+                    "info": match.group("info")
+                })
         
         return {
             "success": True,
@@ -58,9 +198,8 @@ class InfoGathering:
     @staticmethod
     def whatweb_scan(target: str) -> Dict[str, Any]:
         """Execute and parse WhatWeb scan."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
+        timestamp = datetime.now().isoformat()
+        manager = _get_manager()
         result = manager.execute_tool("whatweb", ["-a", "3", target])
         
         if not result["success"]:
@@ -68,7 +207,7 @@ class InfoGathering:
             
         # Parse WhatWeb output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "target": target,
             "technologies": [],
             "headers": {},
@@ -78,8 +217,7 @@ class InfoGathering:
         output = result["output"]
         
         # Parse technologies
-        tech_pattern = r"\[(.*?)\]"
-        parsed["technologies"] = re.findall(tech_pattern, output)
+        parsed["technologies"] = _TECH_RE.findall(output)
         
         return {
             "success": True,
@@ -93,9 +231,8 @@ class WebAppAnalysis:
     @staticmethod
     def nikto_scan(target: str, options: List[str]) -> Dict[str, Any]:
         """Execute and parse Nikto scan."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
+        timestamp = datetime.now().isoformat()
+        manager = _get_manager()
         result = manager.execute_tool("nikto", ["-h", target] + options)
         
         if not result["success"]:
@@ -103,7 +240,7 @@ class WebAppAnalysis:
             
         # Parse Nikto output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "target": target,
             "vulnerabilities": [],
             "information": []
@@ -112,8 +249,13 @@ class WebAppAnalysis:
         output = result["output"]
         
         # Parse findings
-        vuln_pattern = r"\+ (.*?):\s+(.*)"
-        for match in re.finditer(vuln_pattern, output):
+        for line in output.splitlines():
+            # Findings are "+ "-prefixed; skip banners and progress lines cheaply
+            if not line.startswith("+ "):
+                continue
+            match = _NIKTO_RE.match(line)
+            if match is None:
+                continue
             id_, desc = match.groups()
             parsed["vulnerabilities"].append({
                 "id": id_,
@@ -129,9 +271,8 @@ class WebAppAnalysis:
     @staticmethod
     def sqlmap_scan(target: str, options: List[str]) -> Dict[str, Any]:
         """Execute and parse SQLMap scan."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
+        timestamp = datetime.now().isoformat()
+        manager = _get_manager()
         result = manager.execute_tool("sqlmap", ["-u", target] + options)
         
         if not result["success"]:
@@ -139,7 +280,7 @@ class WebAppAnalysis:
             
         # Parse SQLMap output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "target": target,
             "vulnerabilities": [],
             "databases": [],
@@ -149,8 +290,7 @@ class WebAppAnalysis:
         output = result["output"]
         
         # Parse vulnerabilities
-        vuln_pattern = r"sqlmap identified the following injection point"
-        if re.search(vuln_pattern, output):
+        if _SQLMAP_INJECTION_MARKER in output:
             parsed["vulnerabilities"].append({
                 "type": "SQL Injection",
                 "details": "SQL Injection vulnerability found"
@@ -168,9 +308,8 @@ class PasswordAttacks:
     @staticmethod
     def hydra_attack(target: str, service: str, options: List[str]) -> Dict[str, Any]:
         """Execute and parse Hydra attack."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
+        timestamp = datetime.now().isoformat()
+        manager = _get_manager()
         result = manager.execute_tool("hydra", ["-s", service, target] + options)
         
         if not result["success"]:
@@ -178,7 +317,7 @@ class PasswordAttacks:
             
         # Parse Hydra output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "target": target,
             "service": service,
             "credentials": []
@@ -187,8 +326,7 @@ class PasswordAttacks:
         output = result["output"]
         
         # Parse found credentials
-        cred_pattern = r"(\w+)://(\w+):(\w+)@([\w.-]+)"
-        for match in re.finditer(cred_pattern, output):
+        for match in _HYDRA_CRED_RE.finditer(output):
             proto, user, pwd, host = match.groups()
             parsed["credentials"].append({
                 "protocol": proto,
@@ -209,34 +347,58 @@ class ExploitationTools:
     @staticmethod
     def metasploit_exploit(module: str, options: Dict[str, str]) -> Dict[str, Any]:
         """Execute and handle Metasploit module."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
-        
-        # Prepare Metasploit command
-        cmd = ["-q", "-x", f"use {module};"]
+        timestamp = datetime.now().isoformat()
+        
+        # Module paths and option names are interpolated into console
+        # commands, so only plain identifiers are accepted
+        if not _MSF_MODULE_RE.fullmatch(module):
+            return {
+                "success": False,
+                "error": f"Invalid Metasploit module: {module!r}"
+            }
+        invalid = [k for k in options if not _MSF_OPTION_RE.fullmatch(k)]
+        if invalid:
+            return {
+                "success": False,
+                "error": f"Invalid Metasploit option names: {', '.join(map(repr, invalid))}"
+            }
+        
+        manager = _get_manager()
+        msfconsole = manager.get_tool_path("msfconsole") or manager.get_tool_path("metasploit")
+        if msfconsole is None:
+            return {
+                "success": False,
+                "error": "Tool msfconsole not found"
+            }
+        
+        # Prepare Metasploit commands; "-z" keeps new sessions in the
+        # background so the shared console stays usable.
+        # "unset all" clears the module's datastore in case the console
+        # kept values from an earlier run of the same module
+        commands = [f"use {module}", "unset all"]
         for k, v in options.items():
-            cmd.append(f"set {k} {v};")
-        cmd.append("exploit;")
-        
-        result = manager.execute_tool("msfconsole", cmd)
-        
-        if not result["success"]:
-            return result
+            commands.append(f"set {k} {v}")
+        commands.append("exploit -z")
+        
+        try:
+            output = _get_msf_session(msfconsole).run(commands)
+        except (OSError, RuntimeError, ValueError) as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "command": "; ".join(commands)
+            }
             
         # Parse Metasploit output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "module": module,
             "options": options,
             "sessions": []
         }
         
-        output = result["output"]
-        
         # Parse sessions
-        session_pattern = r"Session (\d+) created"
-        for match in re.finditer(session_pattern, output):
+        for match in _MSF_SESSION_RE.finditer(output):
             session_id = match.group(1)
             parsed["sessions"].append({
                 "id": session_id,
@@ -255,9 +417,8 @@ class WirelessAttacks:
     @staticmethod
     def aircrack_attack(capture_file: str, options: List[str]) -> Dict[str, Any]:
         """Execute and parse Aircrack-ng attack."""
-        from .tool_manager import KaliToolManager
-        
-        manager = KaliToolManager()
+        timestamp = datetime.now().isoformat()
+        manager = _get_manager()
         result = manager.execute_tool("aircrack-ng", [capture_file] + options)
         
         if not result["success"]:
@@ -265,7 +426,7 @@ class WirelessAttacks:
             
         # Parse Aircrack output
         parsed = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": timestamp,
             "capture_file": capture_file,
             "networks": [],
             "keys": []
@@ -274,10 +435,11 @@ class WirelessAttacks:
         output = result["output"]
         
         # Parse found keys
-        key_pattern = r"KEY FOUND! \[ (.*?) \]"
-        for match in re.finditer(key_pattern, output):
-            key = match.group(1)
-            parsed["keys"].append(key)
+        for line in output.splitlines():
+            if "KEY FOUND!" not in line:
+                continue
+            for match in _AIRCRACK_KEY_RE.finditer(line):
+                parsed["keys"].append(match.group(1))
         
         return {
             "success": True,
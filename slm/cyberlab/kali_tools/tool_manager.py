@@ -1,11 +1,229 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
+import hashlib
+import os
+import platform
 import re
 import json
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 from pathlib import Path
 import yaml
 from datetime import datetime
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# Linux F_SETPIPE_SZ (exposed by fcntl only on Python 3.10+)
+_F_SETPIPE_SZ = getattr(fcntl, "F_SETPIPE_SZ", 1031)
+TOOL_PIPE_SIZE = 1 << 20
+
+TOOL_PATHS_CACHE = Path.home() / ".cache" / "cybershield" / "tool_paths.json"
+# Seconds before a cached tool-path probe is redone regardless of changes
+TOOL_PATHS_CACHE_TTL = 24 * 60 * 60
+
+# Tool categories as listed in the Kali menu
+_TOOL_CATEGORIES = {
+    "nmap": "Information Gathering",
+    "wireshark": "Sniffing & Spoofing",
+    "metasploit": "Exploitation Tools",
+    "burpsuite": "Web Applications",
+    "sqlmap": "Database Assessment",
+    "hydra": "Password Attacks",
+    "john": "Password Attacks",
+    "aircrack-ng": "Wireless Attacks",
+    "nikto": "Vulnerability Analysis",
+    "gobuster": "Web Applications",
+    "wpscan": "Web Applications",
+    "hashcat": "Password Attacks"
+}
+
+# Fallback directories searched when a tool is not at its configured path
+COMMON_TOOL_DIRS = (
+    "/usr/bin",
+    "/usr/local/bin",
+    "/opt/kali/bin",
+    "C:\\Program Files\\Kali",
+    "C:\\kali",
+    str(Path.home() / "kali")
+)
+
+
+# Executable suffixes a tool name may omit, as shutil.which resolves them
+if sys.platform == "win32":
+    _PATHEXT = tuple(
+        ext.lower()
+        for ext in os.environ.get("PATHEXT", ".COM;.EXE;.BAT;.CMD").split(os.pathsep)
+        if ext
+    )
+else:
+    _PATHEXT = ()
+
+
+def _tool_name_key(name: str) -> str:
+    """Comparison key for a tool file name: case-normalized, minus any PATHEXT suffix."""
+    name = os.path.normcase(name)
+    stem, ext = os.path.splitext(name)
+    return stem if ext and ext in _PATHEXT else name
+
+
+def _list_tool_dir(directory: str) -> Dict[str, str]:
+    """Files in a directory keyed by _tool_name_key, from a single scandir pass."""
+    files: Dict[str, str] = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_file():
+                    files.setdefault(_tool_name_key(entry.name), entry.name)
+    except OSError:
+        # Missing, not a directory, or unreadable
+        pass
+    return files
+
+
+def _probe_tool_paths(tools_paths: Dict[str, str]) -> Dict[str, str]:
+    """Find actual paths of Kali tools on the filesystem."""
+    listings: Dict[str, Dict[str, str]] = {}
+    
+    def find(directory: str, name: str) -> Optional[str]:
+        if directory not in listings:
+            listings[directory] = _list_tool_dir(directory)
+        return listings[directory].get(_tool_name_key(name))
+    
+    paths = {}
+    for tool, default_path in tools_paths.items():
+        # Try default path first
+        default_dir, default_name = os.path.split(default_path)
+        found = find(default_dir or ".", default_name)
+        if found is not None:
+            paths[tool] = os.path.join(default_dir, found) if default_dir else found
+            continue
+            
+        # Try to find in common locations
+        for path in COMMON_TOOL_DIRS:
+            found = find(path, tool)
+            if found is not None:
+                paths[tool] = str(Path(path) / found)
+                break
+    
+    return paths
+
+
+def _load_tool_paths_cache() -> Dict[str, Dict[str, str]]:
+    try:
+        with open(TOOL_PATHS_CACHE, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _store_tool_paths_cache(entries: Dict[str, Dict[str, str]]) -> None:
+    try:
+        TOOL_PATHS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=TOOL_PATHS_CACHE.parent, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(entries, f)
+        os.replace(f.name, TOOL_PATHS_CACHE)
+    except OSError:
+        pass
+
+
+def _widen_pipe(stream) -> None:
+    """Grow a pipe's kernel buffer so chatty tools don't stall on writes."""
+    if fcntl is None or not sys.platform.startswith("linux"):
+        return
+    try:
+        fcntl.fcntl(stream.fileno(), _F_SETPIPE_SZ, TOOL_PIPE_SIZE)
+    except OSError:
+        # Above /proc/sys/fs/pipe-max-size for unprivileged users
+        pass
+
+
+def _run_tool(cmd: List[str], capture_output: bool) -> Tuple[int, Optional[bytes], Optional[bytes]]:
+    """Run a tool, draining stdout and stderr concurrently as raw bytes."""
+    pipe = subprocess.PIPE if capture_output else None
+    process = subprocess.Popen(cmd, stdout=pipe, stderr=pipe, bufsize=-1)
+    if not capture_output:
+        return process.wait(), None, None
+    
+    _widen_pipe(process.stdout)
+    _widen_pipe(process.stderr)
+    stderr_chunks: List[bytes] = []
+    stderr_reader = threading.Thread(
+        target=lambda: stderr_chunks.append(process.stderr.read()), daemon=True
+    )
+    stderr_reader.start()
+    stdout = process.stdout.read()
+    stderr_reader.join()
+    process.stdout.close()
+    process.stderr.close()
+    return process.wait(), stdout, stderr_chunks[0]
+
+
+def _decode(data: Optional[bytes]) -> Optional[str]:
+    """Decode tool output once, applying text-mode newline translation."""
+    if data is None:
+        return None
+    text = data.decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
+
+def _dir_mtimes(directories: List[str]) -> Dict[str, int]:
+    """Modification times (ns) of the given directories; -1 for missing ones."""
+    mtimes = {}
+    for directory in directories:
+        try:
+            mtimes[directory] = os.stat(directory).st_mtime_ns
+        except OSError:
+            mtimes[directory] = -1
+    return mtimes
+
+
+def _resolve_tools_cached(tools_paths: Tuple[Tuple[str, str], ...],
+                          search_path: str) -> Dict[str, str]:
+    """Resolve tool paths, reusing results cached on disk.
+
+    Entries are keyed by platform, the PATH environment and the configured
+    tool paths. A cached entry is only trusted while it is younger than
+    TOOL_PATHS_CACHE_TTL, none of the searched directories has changed
+    (installing or removing a tool updates its directory's mtime) and every
+    cached path still exists; otherwise the filesystem is probed again.
+    """
+    key = hashlib.sha256(
+        json.dumps([platform.system(), search_path, tools_paths]).encode("utf-8")
+    ).hexdigest()
+    directories = sorted(
+        {os.path.dirname(path) or "." for _, path in tools_paths} | set(COMMON_TOOL_DIRS)
+    )
+    mtimes = _dir_mtimes(directories)
+    
+    entries = _load_tool_paths_cache()
+    entry = entries.get(key)
+    if (
+        isinstance(entry, dict)
+        and entry.get("dir_mtimes") == mtimes
+        and time.time() - entry.get("probed_at", 0) < TOOL_PATHS_CACHE_TTL
+        and all(os.path.exists(path) for path in entry["paths"].values())
+    ):
+        return entry["paths"]
+    
+    paths = _probe_tool_paths(dict(tools_paths))
+    entries[key] = {"paths": paths, "dir_mtimes": mtimes, "probed_at": time.time()}
+    _store_tool_paths_cache(entries)
+    return paths
+
 class KaliToolManager:
     """Manager for Kali Linux security tools integration."""
     
@@ -34,42 +252,39 @@ class KaliToolManager:
         
         if config_path and Path(config_path).exists():
             with open(config_path) as f:
-                return yaml.safe_load(f)
+                return yaml.load(f, Loader=_SafeLoader)
         return default_config
     
     def _find_tool_paths(self) -> Dict[str, str]:
         """Find actual paths of Kali tools."""
-        paths = {}
-        for tool, default_path in self.tools_config["tools_paths"].items():
-            # Try default path first
-            if Path(default_path).exists():
-                paths[tool] = default_path
-                continue
-                
-            # Try to find in common locations
-            common_paths = [
-                "/usr/bin",
-                "/usr/local/bin",
-                "/opt/kali/bin",
-                "C:\\Program Files\\Kali",
-                "C:\\kali",
-                str(Path.home() / "kali")
-            ]
-            
-            for path in common_paths:
-                tool_path = Path(path) / tool
-                if tool_path.exists():
-                    paths[tool] = str(tool_path)
-                    break
+        tools_paths = tuple(sorted(self.tools_config["tools_paths"].items()))
+        return dict(_resolve_tools_cached(tools_paths, os.environ.get("PATH", "")))
+    
+    def refresh(self) -> None:
+        """Discard cached tool locations and probe the filesystem again."""
+        try:
+            TOOL_PATHS_CACHE.unlink()
+        except FileNotFoundError:
+            pass
+        self.tool_paths = self._find_tool_paths()
+    
+    def _resolve_missing(self, tool_name: str) -> None:
+        """Re-resolve tool paths after a lookup miss.
         
-        return paths
+        A tool installed after startup changes its directory's mtime, which
+        invalidates the cached probe, so long-lived managers still find it.
+        """
+        if tool_name not in self.tool_paths:
+            self.tool_paths = self._find_tool_paths()
     
     def is_tool_available(self, tool_name: str) -> bool:
         """Check if a specific tool is available."""
+        self._resolve_missing(tool_name)
         return tool_name in self.tool_paths
     
     def get_tool_path(self, tool_name: str) -> Optional[str]:
         """Get the path for a specific tool."""
+        self._resolve_missing(tool_name)
         return self.tool_paths.get(tool_name)
     
     def execute_tool(self, 
@@ -85,16 +300,15 @@ class KaliToolManager:
         
         try:
             cmd = [self.tool_paths[tool_name]] + arguments
-            process = subprocess.run(
-                cmd,
-                capture_output=capture_output,
-                text=True,
-                check=True
-            )
+            returncode, stdout, stderr = _run_tool(cmd, capture_output)
+            if returncode:
+                raise subprocess.CalledProcessError(
+                    returncode, cmd, output=_decode(stdout), stderr=_decode(stderr)
+                )
             
             return {
                 "success": True,
-                "output": process.stdout,
+                "output": _decode(stdout),
                 "command": " ".join(cmd)
             }
             
@@ -127,18 +341,4 @@ class KaliToolManager:
     
     def get_tool_category(self, tool_name: str) -> str:
         """Get the category of a tool."""
-        categories = {
-            "nmap": "Information Gathering",
-            "wireshark": "Sniffing & Spoofing",
-            "metasploit": "Exploitation Tools",
-            "burpsuite": "Web Applications",
-            "sqlmap": "Database Assessment",
-            "hydra": "Password Attacks",
-            "john": "Password Attacks",
-            "aircrack-ng": "Wireless Attacks",
-            "nikto": "Vulnerability Analysis",
-            "gobuster": "Web Applications",
-            "wpscan": "Web Applications",
-            "hashcat": "Password Attacks"
-        }
-        return categories.get(tool_name, "Uncategorized")
+        return _TOOL_CATEGORIES.get(tool_name, "Uncategorized")
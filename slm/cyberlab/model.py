@@ -1,8 +1,199 @@
 import torch
 import torch.nn as nn
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Union
 import yaml
 import os
+import math
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Extensions of the legacy YAML analysis cache
+_LEGACY_CACHE_SUFFIXES = (".yaml", ".yml")
+
+# Keys of the ``model`` config section that aren't CyberLabSLM constructor arguments
+_MODEL_CONFIG_EXTRA_KEYS = ("weights_path",)
+
+
+def content_fingerprint(text: str) -> str:
+    """Stable 128-bit BLAKE2b digest of ``text`` for use as a cache key.
+    
+    Unlike ``hash()``, the value is identical across processes, so
+    persisted analysis caches remain valid after a restart.
+    """
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def script_for_inference(module: nn.Module, freeze: bool = True) -> torch.jit.ScriptModule:
+    """TorchScript-compile ``module`` for inference.
+    
+    The module is switched to eval mode. With ``freeze`` the scripted module
+    is also passed through ``torch.jit.optimize_for_inference``, which
+    inlines parameters as constants and folds operations; the result can
+    no longer be trained.
+    """
+    scripted = torch.jit.script(module.eval())
+    return torch.jit.optimize_for_inference(scripted) if freeze else scripted
+
+
+def compile_for_inference(module: nn.Module, mode: str = "reduce-overhead") -> nn.Module:
+    """Compile ``module`` in place with ``torch.compile`` and return it.
+    
+    Inductor fuses the small elementwise ops around embeddings, convolutions
+    and residual adds into single kernels. Shapes are marked dynamic so
+    varying batch sizes and sequence lengths reuse one graph instead of
+    triggering a recompile per shape.
+    """
+    module.eval()
+    module.compile(mode=mode, dynamic=True)
+    return module
+
+
+def quantize_for_inference(module: nn.Module) -> nn.Module:
+    """Return a copy of ``module`` with Linear/LSTM weights dynamically quantized to INT8.
+    
+    Activations are quantized on the fly, so no calibration data is needed.
+    Intended for CPU inference, where the int8 kernels halve weight traffic
+    and use VNNI dot-product instructions when available.
+    """
+    module.eval()
+    # Weights shared with another module (e.g. an output head tied to the
+    # embedding) stay in float: quantizing one side would duplicate the matrix
+    counts: Dict[int, int] = {}
+    for _, param in module.named_parameters(remove_duplicate=False):
+        counts[id(param)] = counts.get(id(param), 0) + 1
+    qconfig_spec = {
+        name: torch.ao.quantization.default_dynamic_qconfig
+        for name, child in module.named_modules()
+        # Exact type match skips attention out_proj (NonDynamicallyQuantizableLinear)
+        if type(child) in (nn.Linear, nn.LSTM)
+        and all(counts[id(p)] == 1 for p in child.parameters(recurse=False))
+    }
+    quantized = torch.ao.quantization.quantize_dynamic(module, qconfig_spec, dtype=torch.qint8)
+    
+    # The fused encoder "fast path" reads linear1/linear2 weights directly and
+    # can't run packed int8 modules (nor can they take the nested tensors the
+    # encoder builds for padded batches). Clearing this flag, one of the
+    # fast-path preconditions, sends those layers down the standard path that
+    # calls the quantized linears; the activation itself is stored separately.
+    for encoder in quantized.modules():
+        if isinstance(encoder, nn.TransformerEncoder) and not isinstance(
+            encoder.layers[0].linear1, nn.Linear
+        ):
+            encoder.use_nested_tensor = False
+            for layer in encoder.layers:
+                layer.activation_relu_or_gelu = 0
+    return quantized
+
+
+def load_weights(module: nn.Module, path: Union[str, os.PathLike]) -> nn.Module:
+    """Load the state dict saved at ``path`` into ``module`` and return it.
+    
+    The checkpoint is memory-mapped and restricted to tensor data
+    (``weights_only``), and its tensors are assigned to the module rather
+    than copied, so pages are read on demand and shared between processes
+    loading the same file. Torch versions or legacy checkpoints that can't be
+    mapped fall back to a regular load.
+    """
+    try:
+        state = torch.load(path, map_location="cpu", mmap=True, weights_only=True)
+    except (TypeError, RuntimeError):
+        module.load_state_dict(torch.load(path, map_location="cpu"))
+        return module
+    
+    # Assigning replaces Parameter objects, which would untie shared weights
+    # (e.g. an output head tied to the embedding); record and restore them
+    first_owner: Dict[int, str] = {}
+    ties = []
+    for name, param in module.named_parameters(remove_duplicate=False):
+        if id(param) in first_owner:
+            ties.append((name, first_owner[id(param)]))
+        else:
+            first_owner[id(param)] = name
+    
+    module.load_state_dict(state, assign=True)
+    
+    for name, source in ties:
+        owner, _, attr = name.rpartition(".")
+        setattr(module.get_submodule(owner), attr, module.get_parameter(source))
+    return module
+
+
+class AnalysisCache:
+    """Thread-safe LRU cache of analysis results with hit/miss counters."""
+    
+    def __init__(self, maxsize: int = 10_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.RLock()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+    
+    def put(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def load(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the contents, keeping the most recent ``maxsize`` entries."""
+        with self._lock:
+            self._data = OrderedDict(entries)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return dict(self._data)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        # Locks can't be pickled or deep-copied (e.g. by quantize_dynamic)
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.RLock()
+    
+    @property
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses,
+                "size": len(self._data), "maxsize": self.maxsize}
+    
+    def __len__(self) -> int:
+        return len(self._data)
+    
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+
+def _cache_json_path(cache_file: str) -> str:
+    """Map a (possibly legacy .yaml) cache path onto its JSON file."""
+    root, ext = os.path.splitext(cache_file)
+    return root + ".json" if ext in _LEGACY_CACHE_SUFFIXES else cache_file
 
 class CyberLabSLM(nn.Module):
     def __init__(self, 
@@ -17,24 +208,48 @@ class CyberLabSLM(nn.Module):
         
         self.max_seq_length = max_seq_length
         self.d_model = d_model
+        self.embed_scale = math.sqrt(d_model)
         
         # Token embeddings
         self.embedding = nn.Embedding(vocab_size, d_model)
         self.pos_encoder = PositionalEncoding(d_model, dropout, max_seq_length)
         
-        # Transformer encoder
-        encoder_layers = nn.TransformerEncoderLayer(d_model, nhead, dim_feedforward, dropout)
+        # Transformer encoder (batch-first so inference can take the fused
+        # attention / nested-tensor fast path)
+        encoder_layers = nn.TransformerEncoderLayer(
+            d_model, nhead, dim_feedforward, dropout, batch_first=True
+        )
         self.transformer_encoder = nn.TransformerEncoder(encoder_layers, num_layers)
         
-        # Output head
+        # Output head, sharing its weight matrix with the token embedding
         self.output_head = nn.Linear(d_model, vocab_size)
+        self.output_head.weight = self.embedding.weight
         
         # Initialize parameters
         self._init_parameters()
         
         # Cache for analysis results
-        self.analysis_cache: Dict[str, Any] = {}
+        self.analysis_cache = AnalysisCache()
+        
+    @classmethod
+    def from_config(cls,
+                    vocab_size: int,
+                    model_config: Dict[str, Any],
+                    load: bool = True) -> "CyberLabSLM":
+        """Build a model from the ``model`` config section.
         
+        With ``load``, the weights saved at ``weights_path`` are loaded
+        through :func:`load_weights` when the file exists.
+        """
+        model = cls(
+            vocab_size=vocab_size,
+            **{k: v for k, v in model_config.items() if k not in _MODEL_CONFIG_EXTRA_KEYS}
+        )
+        weights_path = model_config.get("weights_path")
+        if load and weights_path and os.path.exists(weights_path):
+            load_weights(model, weights_path)
+        return model
+    
     def _init_parameters(self):
         """Initialize the model parameters."""
         for p in self.parameters():
@@ -44,30 +259,56 @@ class CyberLabSLM(nn.Module):
     def forward(self, 
                 src: torch.Tensor,
                 src_mask: Optional[torch.Tensor] = None,
-                src_key_padding_mask: Optional[torch.Tensor] = None) -> torch.Tensor:
+                src_key_padding_mask: Optional[torch.Tensor] = None,
+                output_hidden_only: bool = False,
+                indices: Optional[torch.Tensor] = None) -> torch.Tensor:
         """
         Forward pass of the model.
         
         Args:
-            src: Input tensor of shape (seq_len, batch_size)
+            src: Input tensor of shape (batch_size, seq_len)
             src_mask: Optional mask for the src sequence
             src_key_padding_mask: Optional key padding mask
+            output_hidden_only: Return the encoder states and skip the
+                vocabulary projection
+            indices: Sequence positions to project (e.g. ``tensor([-1])`` for
+                next-token generation); defaults to every position
             
         Returns:
-            Output tensor of shape (seq_len, batch_size, vocab_size)
+            Output tensor of shape (batch_size, seq_len, vocab_size), with
+            seq_len reduced to ``len(indices)`` when given, or the
+            (batch_size, seq_len, d_model) hidden states with
+            ``output_hidden_only``
         """
         # Embedding and positional encoding
-        src = self.embedding(src) * torch.sqrt(torch.tensor(self.d_model, dtype=torch.float32))
+        src = self.embedding(src) * self.embed_scale
         src = self.pos_encoder(src)
         
         # Transformer encoder
         output = self.transformer_encoder(src, src_mask, src_key_padding_mask)
         
-        # Output projection
+        if output_hidden_only:
+            return output
+        
+        # Output projection, only over the positions that are needed
+        if indices is not None:
+            output = output[:, indices]
         output = self.output_head(output)
         
         return output
     
+    def to_scripted(self, freeze: bool = True) -> torch.jit.ScriptModule:
+        """Return a TorchScript version of this model for inference."""
+        return script_for_inference(self, freeze)
+    
+    def compile_for_inference(self, mode: str = "reduce-overhead") -> "CyberLabSLM":
+        """Compile this model in place with ``torch.compile`` for inference."""
+        return compile_for_inference(self, mode)
+    
+    def to_quantized(self) -> "CyberLabSLM":
+        """Return an INT8 dynamically quantized copy of this model for CPU inference."""
+        return quantize_for_inference(self)
+    
     def analyze_security_log(self, log_content: str) -> Dict[str, Any]:
         """
         Analyze security log content and generate insights.
@@ -79,9 +320,10 @@ class CyberLabSLM(nn.Module):
             Dictionary containing analysis results
         """
         # Check cache first
-        cache_key = hash(log_content)
-        if cache_key in self.analysis_cache:
-            return self.analysis_cache[cache_key]
+        cache_key = content_fingerprint(log_content)
+        cached = self.analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Process the log content and generate analysis
         # TODO: Implement actual log analysis logic
@@ -92,20 +334,41 @@ class CyberLabSLM(nn.Module):
             "findings": [],
             "recommendations": []
         }
-        self.analysis_cache[cache_key] = analysis_result
+        self.analysis_cache.put(cache_key, analysis_result)
         
         return analysis_result
     
     def save_cache(self, cache_file: str):
-        """Save analysis cache to file."""
-        with open(cache_file, 'w') as f:
-            yaml.dump(self.analysis_cache, f)
+        """Save analysis cache to file as JSON."""
+        cache_file = _cache_json_path(cache_file)
+        if orjson is not None:
+            with open(cache_file, 'wb') as f:
+                f.write(orjson.dumps(self.analysis_cache.to_dict()))
+        else:
+            with open(cache_file, 'w') as f:
+                json.dump(self.analysis_cache.to_dict(), f)
             
     def load_cache(self, cache_file: str):
-        """Load analysis cache from file."""
-        if os.path.exists(cache_file):
-            with open(cache_file, 'r') as f:
-                self.analysis_cache = yaml.safe_load(f)
+        """Load analysis cache from file.
+        
+        A legacy YAML cache is read once and rewritten as JSON.
+        """
+        json_file = _cache_json_path(cache_file)
+        if os.path.exists(json_file):
+            with open(json_file, 'rb') as f:
+                data = f.read()
+            self.analysis_cache.load(orjson.loads(data) if orjson is not None else json.loads(data))
+            return
+        
+        for suffix in _LEGACY_CACHE_SUFFIXES:
+            legacy_file = os.path.splitext(json_file)[0] + suffix
+            if os.path.exists(legacy_file):
+                with open(legacy_file, 'r') as f:
+                    legacy = yaml.load(f, Loader=_SafeLoader) or {}
+                # JSON object keys must be strings
+                self.analysis_cache.load({str(k): v for k, v in legacy.items()})
+                self.save_cache(json_file)
+                return
 
 class PositionalEncoding(nn.Module):
     def __init__(self, d_model: int, dropout: float = 0.1, max_len: int = 5000):
@@ -114,15 +377,23 @@ class PositionalEncoding(nn.Module):
 
         position = torch.arange(max_len).unsqueeze(1)
         div_term = torch.exp(torch.arange(0, d_model, 2) * (-torch.log(torch.tensor(10000.0)) / d_model))
-        pe = torch.zeros(max_len, 1, d_model)
-        pe[:, 0, 0::2] = torch.sin(position * div_term)
-        pe[:, 0, 1::2] = torch.cos(position * div_term)
+        pe = torch.zeros(1, max_len, d_model)
+        pe[0, :, 0::2] = torch.sin(position * div_term)
+        pe[0, :, 1::2] = torch.cos(position * div_term)
         self.register_buffer('pe', pe)
 
+    def _load_from_state_dict(self, state_dict, prefix, *args, **kwargs):
+        # Checkpoints from the sequence-first layout store pe as (max_len, 1, d_model)
+        key = prefix + 'pe'
+        pe = state_dict.get(key)
+        if pe is not None and pe.dim() == 3 and pe.size(0) != 1 and pe.size(1) == 1:
+            state_dict[key] = pe.transpose(0, 1)
+        super()._load_from_state_dict(state_dict, prefix, *args, **kwargs)
+
     def forward(self, x: torch.Tensor) -> torch.Tensor:
         """
         Args:
-            x: Tensor of shape (seq_len, batch_size, d_model)
+            x: Tensor of shape (batch_size, seq_len, d_model)
         """
-        x = x + self.pe[:x.size(0)]
+        x = x + self.pe[:, :x.size(1)]
         return self.dropout(x)
@@ -1,10 +1,15 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import torch
 import numpy as np
 from pathlib import Path
 import yaml
 import json
 
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 class SecurityLogParser:
     """Parser for various security tool outputs and log formats."""
     
@@ -16,10 +21,10 @@ class SecurityLogParser:
     def load_patterns(self, patterns_file: str):
         """Load log parsing patterns from a YAML file."""
         with open(patterns_file, 'r') as f:
-            self.patterns = yaml.safe_load(f)
+            self.patterns = yaml.load(f, Loader=_SafeLoader)
     
-    def parse_nmap_output(self, content: str) -> Dict[str, Any]:
-        """Parse Nmap scan output."""
+    def parse_nmap_output(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        """Parse Nmap scan output. Accepts raw bytes or decoded text."""
         result = {
             "hosts": [],
             "ports": [],
@@ -30,8 +35,8 @@ class SecurityLogParser:
         # TODO: Implement Nmap output parsing
         return result
     
-    def parse_nikto_output(self, content: str) -> Dict[str, Any]:
-        """Parse Nikto web server scanner output."""
+    def parse_nikto_output(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        """Parse Nikto web server scanner output. Accepts raw bytes or decoded text."""
         result = {
             "target": "",
             "findings": [],
@@ -41,8 +46,8 @@ class SecurityLogParser:
         # TODO: Implement Nikto output parsing
         return result
     
-    def parse_wireshark_output(self, content: str) -> Dict[str, Any]:
-        """Parse Wireshark/tcpdump output."""
+    def parse_wireshark_output(self, content: Union[str, bytes]) -> Dict[str, Any]:
+        """Parse Wireshark/tcpdump output. Accepts raw bytes or decoded text."""
         result = {
             "packets": [],
             "protocols": [],
@@ -67,6 +72,10 @@ class TokenizerWrapper:
     def encode(self, text: str) -> List[int]:
         """Encode text to token ids."""
         return self.sp.EncodeAsIds(text)
+    
+    def encode_batch(self, texts: List[str]) -> List[List[int]]:
+        """Encode many texts in one call on SentencePiece's own thread pool."""
+        return self.sp.encode(texts, out_type=int, num_threads=-1)
         
     def decode(self, ids: List[int]) -> str:
         """Decode token ids to text."""
@@ -94,29 +103,31 @@ class DataProcessor:
     def prepare_batch(self, texts: List[str]) -> Dict[str, torch.Tensor]:
         """Prepare a batch of texts for the model."""
         # Tokenize all texts
-        token_ids = [self.tokenizer.encode(text) for text in texts]
+        token_ids = self.tokenizer.encode_batch(texts)
         
-        # Pad sequences
-        padded = self._pad_sequences(token_ids)
+        # Pad/truncate into one preallocated array; id 0 doubles as padding
+        L = self.max_seq_length
+        input_ids = np.zeros((len(token_ids), L), dtype=np.int64)
+        lengths = np.empty(len(token_ids), dtype=np.int64)
+        for i, seq in enumerate(token_ids):
+            seq = seq[:L]
+            input_ids[i, :len(seq)] = seq
+            lengths[i] = len(seq)
         
-        # Create attention mask
-        attention_mask = self._create_attention_mask(padded)
+        # Create attention mask from the sequence lengths: one broadcast
+        # compare that never reads input_ids, reinterpreted as int8 in place
+        attention_mask = (np.arange(L) < lengths[:, None]).view(np.int8)
         
         return {
-            'input_ids': torch.tensor(padded),
-            'attention_mask': torch.tensor(attention_mask)
+            'input_ids': torch.from_numpy(input_ids),
+            'attention_mask': torch.from_numpy(attention_mask)
         }
     
-    def _pad_sequences(self, sequences: List[List[int]]) -> List[List[int]]:
-        """Pad sequences to max_seq_length."""
-        padded = []
-        for seq in sequences:
-            if len(seq) > self.max_seq_length:
-                padded.append(seq[:self.max_seq_length])
-            else:
-                padded.append(seq + [0] * (self.max_seq_length - len(seq)))
-        return padded
-    
-    def _create_attention_mask(self, padded_sequences: List[List[int]]) -> List[List[int]]:
-        """Create attention mask for padded sequences."""
-        return [[1 if token != 0 else 0 for token in seq] for seq in padded_sequences]
+    def prepare_dataset(self, texts: List[str], chunk_size: int = 1024) -> torch.utils.data.TensorDataset:
+        """Tokenize a whole corpus once into a dataset of (input_ids, attention_mask)."""
+        input_ids, attention_mask = [], []
+        for i in range(0, len(texts), chunk_size):
+            batch = self.prepare_batch(texts[i:i + chunk_size])
+            input_ids.append(batch['input_ids'])
+            attention_mask.append(batch['attention_mask'])
+        return torch.utils.data.TensorDataset(torch.cat(input_ids), torch.cat(attention_mask))
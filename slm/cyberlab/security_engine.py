@@ -1,10 +1,21 @@
 import torch.nn as nn
 import torch
+import torch.nn.functional as F
 from typing import Dict, List, Optional, Tuple, Any
 import yaml
 import json
 from pathlib import Path
 
+from .model import (
+    AnalysisCache, compile_for_inference, content_fingerprint, quantize_for_inference,
+    script_for_inference
+)
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
 class SecurityAnalyzer(nn.Module):
     """Core security analysis engine for CyberLab Assistant."""
     
@@ -27,7 +38,16 @@ class SecurityAnalyzer(nn.Module):
         
         # Security feature extractors
         self.pattern_encoder = nn.Conv1d(embedding_dim, embedding_dim, kernel_size=3, padding=1)
-        self.temporal_encoder = nn.LSTM(embedding_dim, embedding_dim // 2, num_layers=2, bidirectional=True)
+        # Dilated depthwise-separable convolutions: a 7-token receptive field
+        # that runs in parallel across the sequence, unlike a recurrent encoder
+        self.temporal_encoder = nn.Sequential(
+            nn.Conv1d(embedding_dim, embedding_dim, kernel_size=3, padding=1, groups=embedding_dim),
+            nn.Conv1d(embedding_dim, embedding_dim, kernel_size=1),
+            nn.GELU(),
+            nn.Conv1d(embedding_dim, embedding_dim, kernel_size=3, padding=2, dilation=2,
+                      groups=embedding_dim),
+            nn.Conv1d(embedding_dim, embedding_dim, kernel_size=1)
+        )
         
         # Main transformer block
         encoder_layer = nn.TransformerEncoderLayer(
@@ -43,29 +63,36 @@ class SecurityAnalyzer(nn.Module):
         self.threat_detector = nn.Linear(embedding_dim, 1)
         self.vulnerability_classifier = nn.Linear(embedding_dim, 4)  # Low, Medium, High, Critical
         self.command_generator = nn.Linear(embedding_dim, vocab_size)
+        self.command_generator.weight = self.token_embedding.weight  # tied
         
         # Analysis cache
-        self.analysis_cache = {}
+        self.analysis_cache = AnalysisCache()
         
     def forward(self, 
                 input_ids: torch.Tensor,
-                attention_mask: Optional[torch.Tensor] = None) -> Dict[str, torch.Tensor]:
-        """Forward pass with multiple security analysis outputs."""
+                attention_mask: Optional[torch.Tensor] = None,
+                predict_commands: bool = True,
+                command_indices: Optional[torch.Tensor] = None) -> Dict[str, torch.Tensor]:
+        """Forward pass with multiple security analysis outputs.
         
-        # Generate position ids
-        position_ids = torch.arange(input_ids.shape[1], device=input_ids.device).unsqueeze(0)
+        The vocabulary-sized command projection is the most expensive head:
+        ``predict_commands=False`` leaves ``command_predictions`` out, and
+        ``command_indices`` restricts it to the given sequence positions.
+        """
         
-        # Embeddings
+        # Embeddings. Positions are always 0..L-1, so the position lookup is
+        # just a view of the first L rows of the table (no arange, no gather)
         token_embeds = self.token_embedding(input_ids)
-        pos_embeds = self.position_embedding(position_ids)
+        pos_embeds = self.position_embedding.weight[:input_ids.shape[1]]
         embeddings = token_embeds + pos_embeds
         
         # Feature extraction
-        pattern_features = self.pattern_encoder(embeddings.transpose(1, 2)).transpose(1, 2)
-        temporal_features, _ = self.temporal_encoder(embeddings)
+        channels = embeddings.transpose(1, 2)
+        pattern_features = self.pattern_encoder(channels)
+        temporal_features = self.temporal_encoder(channels)
         
         # Combine features
-        features = pattern_features + temporal_features
+        features = (pattern_features + temporal_features).transpose(1, 2)
         
         # Transformer encoding
         if attention_mask is not None:
@@ -78,14 +105,28 @@ class SecurityAnalyzer(nn.Module):
         # Task-specific predictions
         threat_scores = self.threat_detector(encoded).squeeze(-1)
         vuln_classes = self.vulnerability_classifier(encoded)
-        next_commands = self.command_generator(encoded)
-        
-        return {
+        outputs = {
             "threat_scores": threat_scores,
             "vulnerability_classes": vuln_classes,
-            "command_predictions": next_commands,
             "encoded_features": encoded
         }
+        if predict_commands:
+            command_input = encoded if command_indices is None else encoded[:, command_indices]
+            outputs["command_predictions"] = self.command_generator(command_input)
+        
+        return outputs
+    
+    def to_scripted(self, freeze: bool = True) -> torch.jit.ScriptModule:
+        """Return a TorchScript version of this module for inference."""
+        return script_for_inference(self, freeze)
+    
+    def compile_for_inference(self, mode: str = "reduce-overhead") -> "SecurityAnalyzer":
+        """Compile this model in place with ``torch.compile`` for inference."""
+        return compile_for_inference(self, mode)
+    
+    def to_quantized(self) -> "SecurityAnalyzer":
+        """Return an INT8 dynamically quantized copy of this model for CPU inference."""
+        return quantize_for_inference(self)
     
     def analyze_security_data(self, 
                             data: str,
@@ -94,13 +135,14 @@ class SecurityAnalyzer(nn.Module):
         """Analyze security-related data with caching."""
         
         # Generate cache key
-        cache_key = f"{data_type}:{hash(data)}"
+        cache_key = f"{data_type}:{content_fingerprint(data)}"
         if context:
-            cache_key += f":{hash(str(context))}"
+            cache_key += f":{content_fingerprint(repr(context))}"
             
         # Check cache
-        if cache_key in self.analysis_cache:
-            return self.analysis_cache[cache_key]
+        cached = self.analysis_cache.get(cache_key)
+        if cached is not None:
+            return cached
         
         # Process based on data type
         if data_type == "log":
@@ -113,7 +155,7 @@ class SecurityAnalyzer(nn.Module):
             analysis = self._analyze_generic_data(data, context)
             
         # Cache results
-        self.analysis_cache[cache_key] = analysis
+        self.analysis_cache.put(cache_key, analysis)
         return analysis
     
     def _analyze_log_data(self, log_data: str, context: Optional[Dict[str, Any]]) -> Dict[str, Any]:
@@ -159,7 +201,7 @@ class SecurityAnalyzer(nn.Module):
         """Save model state and analysis cache."""
         state = {
             "model_state": self.state_dict(),
-            "analysis_cache": self.analysis_cache
+            "analysis_cache": self.analysis_cache.to_dict()
         }
         torch.save(state, path)
     
@@ -167,7 +209,7 @@ class SecurityAnalyzer(nn.Module):
         """Load model state and analysis cache."""
         state = torch.load(path)
         self.load_state_dict(state["model_state"])
-        self.analysis_cache = state["analysis_cache"]
+        self.analysis_cache.load(state["analysis_cache"])
         
 class IntentProcessor(nn.Module):
     """Process and understand user intents for security operations."""
@@ -201,6 +243,10 @@ class IntentProcessor(nn.Module):
             "intent_logits": intent_logits,
             "encoded_input": lstm_out
         }
+    
+    def to_scripted(self, freeze: bool = True) -> torch.jit.ScriptModule:
+        """Return a TorchScript version of this module for inference."""
+        return script_for_inference(self, freeze)
 
 class CommandGenerator(nn.Module):
     """Generate secure system commands based on user intent."""
@@ -227,7 +273,7 @@ class CommandGenerator(nn.Module):
         template_path = Path(__file__).parent / "config" / "command_templates.yaml"
         if template_path.exists():
             with open(template_path) as f:
-                self.templates = yaml.safe_load(f)
+                self.templates = yaml.load(f, Loader=_SafeLoader)
         else:
             self.templates = {}
             
@@ -245,6 +291,106 @@ class CommandGenerator(nn.Module):
             
         return self.output_projection(output)
     
+    @staticmethod
+    def _split_heads(x: torch.Tensor, num_heads: int) -> torch.Tensor:
+        batch, length, dim = x.shape
+        return x.view(batch, length, num_heads, dim // num_heads).transpose(1, 2)
+    
+    @staticmethod
+    def _merge_heads(x: torch.Tensor) -> torch.Tensor:
+        batch, heads, length, head_dim = x.shape
+        return x.transpose(1, 2).reshape(batch, length, heads * head_dim)
+    
+    def prepare_memory(self, encoded_intent: torch.Tensor) -> List[Tuple[torch.Tensor, torch.Tensor]]:
+        """Project the encoded intent into every layer's cross-attention keys/values.
+        
+        The result depends only on the intent, so it is computed once per
+        request and shared by all ``decode_step`` calls.
+        """
+        memory_kv = []
+        for layer in self.command_decoder.layers:
+            attn = layer.multihead_attn
+            dim = attn.embed_dim
+            weight, bias = attn.in_proj_weight, attn.in_proj_bias
+            key = F.linear(encoded_intent, weight[dim:2 * dim], bias[dim:2 * dim])
+            value = F.linear(encoded_intent, weight[2 * dim:], bias[2 * dim:])
+            memory_kv.append((self._split_heads(key, attn.num_heads),
+                              self._split_heads(value, attn.num_heads)))
+        return memory_kv
+    
+    def decode_step(self,
+                    tokens: torch.Tensor,
+                    memory_kv: List[Tuple[torch.Tensor, torch.Tensor]],
+                    kv_cache: Optional[List[Tuple[torch.Tensor, torch.Tensor]]] = None
+                    ) -> Tuple[torch.Tensor, List[Tuple[torch.Tensor, torch.Tensor]]]:
+        """Decode the newest token of each sequence, reusing cached attention state.
+        
+        Equivalent to running ``command_decoder`` causally over the whole
+        prefix, but each step only attends from the new position: the
+        self-attention keys/values of earlier positions come from
+        ``kv_cache``. Intended for inference (attention dropout is skipped).
+        
+        Args:
+            tokens: Latest token ids of shape (batch, 1)
+            memory_kv: Output of ``prepare_memory``
+            kv_cache: Cache returned by the previous step, or None at the start
+            
+        Returns:
+            Logits of shape (batch, 1, vocab_size) and the updated cache
+        """
+        x = self.embedding(tokens)
+        new_cache = []
+        for i, layer in enumerate(self.command_decoder.layers):
+            # Causal self-attention over cached positions plus this one
+            attn = layer.self_attn
+            query, key, value = F.linear(x, attn.in_proj_weight, attn.in_proj_bias).chunk(3, dim=-1)
+            query, key, value = (self._split_heads(t, attn.num_heads) for t in (query, key, value))
+            if kv_cache is not None:
+                past_key, past_value = kv_cache[i]
+                key = torch.cat([past_key, key], dim=2)
+                value = torch.cat([past_value, value], dim=2)
+            new_cache.append((key, value))
+            out = self._merge_heads(F.scaled_dot_product_attention(query, key, value))
+            x = layer.norm1(x + layer.dropout1(attn.out_proj(out)))
+            
+            # Cross-attention against the precomputed intent memory
+            attn = layer.multihead_attn
+            dim = attn.embed_dim
+            query = self._split_heads(
+                F.linear(x, attn.in_proj_weight[:dim], attn.in_proj_bias[:dim]), attn.num_heads
+            )
+            memory_key, memory_value = memory_kv[i]
+            out = self._merge_heads(F.scaled_dot_product_attention(query, memory_key, memory_value))
+            x = layer.norm2(x + layer.dropout2(attn.out_proj(out)))
+            
+            x = layer.norm3(x + layer._ff_block(x))
+        
+        return self.output_projection(x), new_cache
+    
+    @torch.inference_mode()
+    def generate(self,
+                 encoded_intent: torch.Tensor,
+                 max_length: int = 64,
+                 start_token: int = 0,
+                 eos_token: Optional[int] = None) -> torch.Tensor:
+        """Greedily decode command token ids for an encoded intent."""
+        memory_kv = self.prepare_memory(encoded_intent)
+        tokens = torch.full((encoded_intent.shape[0], 1), start_token,
+                            dtype=torch.long, device=encoded_intent.device)
+        kv_cache = None
+        generated = []
+        for _ in range(max_length):
+            logits, kv_cache = self.decode_step(tokens, memory_kv, kv_cache)
+            tokens = logits[:, -1].argmax(dim=-1, keepdim=True)
+            generated.append(tokens)
+            if eos_token is not None and bool((tokens == eos_token).all()):
+                break
+        return torch.cat(generated, dim=1)
+    
+    def to_scripted(self, freeze: bool = True) -> torch.jit.ScriptModule:
+        """Return a TorchScript version of this module for inference."""
+        return script_for_inference(self, freeze)
+    
     def validate_command(self, command: str) -> Tuple[bool, str]:
         """Validate generated command against security rules."""
         # TODO: Implement command validation
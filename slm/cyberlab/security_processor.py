@@ -1,12 +1,132 @@
 import torch
 import torch.nn.functional as F
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
 import json
 from pathlib import Path
 import yaml
 import re
+from bisect import bisect_right
 from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
+
+try:
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
+
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+# Common timestamp patterns
+_TIMESTAMP_PATTERNS = (
+    re.compile(r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}"),  # ISO format
+    re.compile(r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}"),  # Common format
+    re.compile(r"\w{3} \d{2} \d{2}:\d{2}:\d{2}")  # Syslog format
+)
+
+# Log sources, checked in order
+_SOURCE_PATTERNS = tuple(
+    (source, re.compile(pattern, re.IGNORECASE))
+    for source, pattern in (
+        ("kernel", r"kernel:"),
+        ("sshd", r"sshd\["),
+        ("apache", r"apache2?\["),
+        ("nginx", r"nginx\["),
+        ("fail2ban", r"fail2ban"),
+        ("ufw", r"UFW"),
+        ("iptables", r"iptables")
+    )
+)
+
+# Characters of surrounding text kept on each side of an IOC match
+IOC_CONTEXT_CHARS = 50
+
+def _build_prefilter(groups: Dict[str, List[re.Pattern]], batch: bool = False):
+    """Compile every pattern into one Hyperscan database used as a prefilter.
+    
+    Patterns are compiled in prefilter mode, so Hyperscan may report false
+    positives but never misses a pattern that ``re`` would match; reported
+    patterns are then run through ``re`` for exact match positions. Returns
+    ``None`` when Hyperscan is unavailable or rejects a pattern.
+    
+    A ``batch`` database scans newline-joined entries: it reports every match
+    (not just the first per pattern) so hits can be attributed to entries,
+    and uses multiline mode so ``^``/``$`` still match at entry boundaries.
+    """
+    flat = [(name, pattern) for name, patterns in groups.items() for pattern in patterns]
+    if hyperscan is None or not flat:
+        return None
+    
+    base_flags = (hyperscan.HS_FLAG_PREFILTER | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP |
+                  (hyperscan.HS_FLAG_MULTILINE if batch else hyperscan.HS_FLAG_SINGLEMATCH))
+    db = hyperscan.Database()
+    try:
+        db.compile(
+            expressions=[pattern.pattern.encode("utf-8") for _, pattern in flat],
+            ids=list(range(len(flat))),
+            elements=len(flat),
+            flags=[
+                base_flags | (hyperscan.HS_FLAG_CASELESS if pattern.flags & re.IGNORECASE else 0)
+                for _, pattern in flat
+            ]
+        )
+    except hyperscan.error:
+        return None
+    return db, flat
+
+
+def _candidate_patterns(groups: Dict[str, List[re.Pattern]],
+                        prefilter, data: str) -> Iterator[Tuple[str, re.Pattern]]:
+    """Yield (group, pattern) pairs that may match ``data``, in pattern order."""
+    if prefilter is None:
+        for name, patterns in groups.items():
+            for pattern in patterns:
+                yield name, pattern
+        return
+    
+    db, flat = prefilter
+    hits = set()
+    # One pass over the buffer for all patterns
+    db.scan(data.encode("utf-8", errors="replace"),
+            match_event_handler=lambda pattern_id, *_: hits.add(pattern_id))
+    for pattern_id in sorted(hits):
+        yield flat[pattern_id]
+
+
+def _batch_candidates(prefilter, entries: List[str]) -> List[List[Tuple[str, re.Pattern]]]:
+    """Scan all ``entries`` in one pass and return each entry's candidate patterns.
+    
+    Entries are joined with newlines into a single buffer; each reported match
+    end offset is mapped back to its entry by bisecting the entry start offsets.
+    """
+    db, flat = prefilter
+    encoded = [entry.encode("utf-8", errors="replace") for entry in entries]
+    starts = []
+    offset = 0
+    for chunk in encoded:
+        starts.append(offset)
+        offset += len(chunk) + 1
+    
+    hits = [set() for _ in entries]
+    
+    def on_match(pattern_id, start, end, flags, context):
+        hits[bisect_right(starts, max(end - 1, 0)) - 1].add(pattern_id)
+    
+    db.scan(b"\n".join(encoded), match_event_handler=on_match)
+    return [[flat[pattern_id] for pattern_id in sorted(entry_hits)] for entry_hits in hits]
+
+@lru_cache(maxsize=1)
+def _get_detection_engines() -> Dict[str, Any]:
+    """Create the detection engines once and share them across processors."""
+    return {
+        "anomaly": AnomalyDetector(),
+        "threat": ThreatDetector(),
+        "vulnerability": VulnerabilityDetector(),
+        "behavior": BehaviorAnalyzer()
+    }
 
 @dataclass
 class SecurityContext:
@@ -24,6 +144,14 @@ class SecurityProcessor:
         self.ioc_patterns = {}
         self.attack_patterns = {}
         
+        # Compiled forms of the loaded patterns
+        self._risk_regexes: Dict[str, List[re.Pattern]] = {}
+        self._ioc_regexes: Dict[str, List[re.Pattern]] = {}
+        self._attack_regexes: Dict[str, List[re.Pattern]] = {}
+        self._ioc_prefilter = None
+        self._attack_prefilter = None
+        self._batch_prefilters = None
+        
         if patterns_file:
             self.load_patterns(patterns_file)
             
@@ -33,21 +161,31 @@ class SecurityProcessor:
     def load_patterns(self, patterns_file: str):
         """Load security patterns from YAML file."""
         with open(patterns_file) as f:
-            data = yaml.safe_load(f)
+            data = yaml.load(f, Loader=_SafeLoader)
             self.patterns = data.get("patterns", {})
             self.risk_patterns = data.get("risks", {})
             self.ioc_patterns = data.get("iocs", {})
             self.attack_patterns = data.get("attacks", {})
+        
+        self._risk_regexes = self._compile(self.risk_patterns, re.IGNORECASE)
+        self._ioc_regexes = self._compile(self.ioc_patterns)
+        self._attack_regexes = self._compile(self.attack_patterns, re.IGNORECASE)
+        self._ioc_prefilter = _build_prefilter(self._ioc_regexes)
+        self._attack_prefilter = _build_prefilter(self._attack_regexes)
+        self._batch_prefilters = None
     
-    def _init_detection_engines(self):
-        """Initialize various detection engines."""
-        self.engines = {
-            "anomaly": AnomalyDetector(),
-            "threat": ThreatDetector(),
-            "vulnerability": VulnerabilityDetector(),
-            "behavior": BehaviorAnalyzer()
+    @staticmethod
+    def _compile(groups: Dict[str, List[str]], flags: int = 0) -> Dict[str, List[re.Pattern]]:
+        """Compile each group's patterns once so per-entry checks skip the re cache."""
+        return {
+            name: [re.compile(pattern, flags) for pattern in patterns]
+            for name, patterns in groups.items()
         }
     
+    def _init_detection_engines(self):
+        """Initialize various detection engines (shared module-wide)."""
+        self.engines = _get_detection_engines()
+    
     def analyze_log_entry(self, log_entry: str) -> SecurityContext:
         """Analyze a single log entry for security implications."""
         # Extract timestamp and metadata
@@ -71,6 +209,51 @@ class SecurityProcessor:
             }
         )
     
+    def analyze_log_batch(self, log_entries: List[str]) -> List[SecurityContext]:
+        """Analyze many log entries, scanning the whole batch once per pattern set.
+        
+        Produces the same results as calling ``analyze_log_entry`` on each
+        entry. With Hyperscan available, the risk, attack and IOC patterns are
+        each matched against one concatenated buffer, and only the patterns
+        that hit an entry are re-run on it with ``re``.
+        """
+        prefilters = self._get_batch_prefilters()
+        if prefilters is None or not log_entries:
+            return [self.analyze_log_entry(entry) for entry in log_entries]
+        
+        risk_prefilter, attack_prefilter, ioc_prefilter = prefilters
+        risk_hits = _batch_candidates(risk_prefilter, log_entries)
+        attack_hits = _batch_candidates(attack_prefilter, log_entries)
+        ioc_hits = _batch_candidates(ioc_prefilter, log_entries)
+        
+        return [
+            SecurityContext(
+                timestamp=self._extract_timestamp(entry),
+                source=self._identify_source(entry),
+                severity=self._assess_risk(entry, risk_hits[i]),
+                details={
+                    "threats": self._detect_threats(entry, attack_hits[i]),
+                    "iocs": self._extract_iocs(entry, ioc_hits[i]),
+                    "anomalies": self._detect_anomalies(entry)
+                }
+            )
+            for i, entry in enumerate(log_entries)
+        ]
+    
+    def _get_batch_prefilters(self):
+        """Build the batch-mode prefilter databases on first use.
+        
+        Returns ``None`` if any pattern set can't be prefiltered, in which
+        case batches fall back to per-entry analysis.
+        """
+        if self._batch_prefilters is None:
+            prefilters = tuple(
+                _build_prefilter(groups, batch=True)
+                for groups in (self._risk_regexes, self._attack_regexes, self._ioc_regexes)
+            )
+            self._batch_prefilters = False if None in prefilters else prefilters
+        return self._batch_prefilters or None
+    
     def analyze_network_traffic(self, traffic_data: str) -> Dict[str, Any]:
         """Analyze network traffic data for security issues."""
         analysis = {
@@ -102,15 +285,8 @@ class SecurityProcessor:
     
     def _extract_timestamp(self, log_entry: str) -> datetime:
         """Extract timestamp from log entry."""
-        # Common timestamp patterns
-        patterns = [
-            r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}",  # ISO format
-            r"\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}",  # Common format
-            r"\w{3} \d{2} \d{2}:\d{2}:\d{2}"  # Syslog format
-        ]
-        
-        for pattern in patterns:
-            if match := re.search(pattern, log_entry):
+        for pattern in _TIMESTAMP_PATTERNS:
+            if match := pattern.search(log_entry):
                 try:
                     return datetime.fromisoformat(match.group(0))
                 except ValueError:
@@ -120,24 +296,19 @@ class SecurityProcessor:
     
     def _identify_source(self, log_entry: str) -> str:
         """Identify the source of a log entry."""
-        sources = {
-            "kernel": r"kernel:",
-            "sshd": r"sshd\[",
-            "apache": r"apache2?\[",
-            "nginx": r"nginx\[",
-            "fail2ban": r"fail2ban",
-            "ufw": r"UFW",
-            "iptables": r"iptables"
-        }
-        
-        for source, pattern in sources.items():
-            if re.search(pattern, log_entry, re.IGNORECASE):
+        for source, pattern in _SOURCE_PATTERNS:
+            if pattern.search(log_entry):
                 return source
                 
         return "unknown"
     
-    def _assess_risk(self, data: str) -> str:
-        """Assess risk level of security data."""
+    def _assess_risk(self, data: str,
+                     candidates: Optional[List[Tuple[str, re.Pattern]]] = None) -> str:
+        """Assess risk level of security data.
+        
+        ``candidates`` limits the check to patterns a batch prefilter reported
+        for this entry; by default every risk pattern is tried.
+        """
         risk_scores = {
             "critical": 0,
             "high": 0,
@@ -146,10 +317,13 @@ class SecurityProcessor:
         }
         
         # Check against risk patterns
-        for severity, patterns in self.risk_patterns.items():
-            for pattern in patterns:
-                if re.search(pattern, data, re.IGNORECASE):
-                    risk_scores[severity] += 1
+        if candidates is None:
+            candidates = [(severity, pattern)
+                          for severity, patterns in self._risk_regexes.items()
+                          for pattern in patterns]
+        for severity, pattern in candidates:
+            if pattern.search(data):
+                risk_scores[severity] += 1
         
         # Determine overall risk level
         if risk_scores["critical"] > 0:
@@ -161,36 +335,44 @@ class SecurityProcessor:
         else:
             return "low"
     
-    def _detect_threats(self, data: str) -> List[Dict[str, Any]]:
+    def _detect_threats(self, data: str,
+                        candidates: Optional[List[Tuple[str, re.Pattern]]] = None
+                        ) -> List[Dict[str, Any]]:
         """Detect potential security threats."""
         threats = []
         
-        for category, patterns in self.attack_patterns.items():
-            for pattern in patterns:
-                if matches := re.finditer(pattern, data, re.IGNORECASE):
-                    for match in matches:
-                        threats.append({
-                            "category": category,
-                            "pattern": pattern,
-                            "match": match.group(0),
-                            "position": match.span()
-                        })
+        if candidates is None:
+            candidates = _candidate_patterns(self._attack_regexes, self._attack_prefilter, data)
+        for category, pattern in candidates:
+            for match in pattern.finditer(data):
+                threats.append({
+                    "category": category,
+                    "pattern": pattern.pattern,
+                    "match": match.group(0),
+                    "position": match.span()
+                })
         
         return threats
     
-    def _extract_iocs(self, data: str) -> List[Dict[str, Any]]:
+    def _extract_iocs(self, data: str,
+                      candidates: Optional[List[Tuple[str, re.Pattern]]] = None
+                      ) -> List[Dict[str, Any]]:
         """Extract Indicators of Compromise (IoCs)."""
         iocs = []
         
-        for ioc_type, patterns in self.ioc_patterns.items():
-            for pattern in patterns:
-                if matches := re.finditer(pattern, data):
-                    for match in matches:
-                        iocs.append({
-                            "type": ioc_type,
-                            "value": match.group(0),
-                            "context": data[max(0, match.start()-50):min(len(data), match.end()+50)]
-                        })
+        if candidates is None:
+            candidates = _candidate_patterns(self._ioc_regexes, self._ioc_prefilter, data)
+        for ioc_type, pattern in candidates:
+            iocs.extend(
+                {
+                    "type": ioc_type,
+                    "value": match.group(0),
+                    # Slices clamp at the end, so only the start needs bounding
+                    "context": data[max(0, match.start() - IOC_CONTEXT_CHARS):
+                                    match.end() + IOC_CONTEXT_CHARS]
+                }
+                for match in pattern.finditer(data)
+            )
         
         return iocs
     
@@ -1,8 +1,9 @@
 """Anthropic Claude provider implementation."""
 
+import importlib.util
 import os
-from typing import Optional, Dict, Any, List
-from slm.llm.base import LLMProvider, LLMResponse
+from typing import Optional, Dict, Any, Iterator, List
+from slm.llm.base import LLMProvider, LLMResponse, build_http_client, cached_response
 
 
 class AnthropicProvider(LLMProvider):
@@ -10,11 +11,19 @@ class AnthropicProvider(LLMProvider):
 
     DEFAULT_MODEL = "claude-sonnet-4-20250514"
 
+    # Per-call parameters forwarded to the API when set (None means unset)
+    OPTIONAL_PARAMS = ("max_tokens", "temperature", "top_p", "stop_sequences")
+
+    # Anthropic ignores cache_control on prefixes shorter than 1024 tokens;
+    # at roughly 4 characters per token, shorter system prompts aren't marked
+    PROMPT_CACHE_MIN_CHARS = 4 * 1024
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         max_tokens: int = 4096,
+        cache_system: bool = True,
         **kwargs
     ):
         """Initialize Anthropic provider.
@@ -23,46 +32,56 @@ class AnthropicProvider(LLMProvider):
             api_key: Anthropic API key (or set ANTHROPIC_API_KEY env var)
             model: Model to use (default: claude-sonnet-4-20250514)
             max_tokens: Maximum tokens in response
+            cache_system: Mark system prompts long enough to be cached for
+                Anthropic prompt caching
             **kwargs: Additional parameters
         """
         super().__init__(api_key=api_key, model=model)
         self.api_key = api_key or os.environ.get("ANTHROPIC_API_KEY", "")
         self.model = model or self.DEFAULT_MODEL
         self.max_tokens = max_tokens
+        self.cache_system = cache_system
         self.extra_kwargs = kwargs
+        self._client = None
+        self._async_client = None
 
-    def _get_client(self):
-        """Get or create Anthropic client."""
-        try:
-            from anthropic import Anthropic
-            return Anthropic(api_key=self.api_key)
-        except ImportError:
+        # Request arguments shared by every call
+        self._base_kwargs = {"model": self.model, "max_tokens": self.max_tokens}
+
+        # Fail at construction rather than on the first chat() call
+        if self.api_key and importlib.util.find_spec("anthropic") is None:
             raise ImportError(
                 "Anthropic SDK not installed. Install with: pip install anthropic"
             )
 
-    def chat(
+    def _get_client(self):
+        """Get or create the cached Anthropic client."""
+        if self._client is None:
+            from anthropic import Anthropic
+            self._client = Anthropic(api_key=self.api_key, http_client=build_http_client())
+        return self._client
+
+    def _get_async_client(self):
+        """Get or create the cached async Anthropic client."""
+        if self._async_client is None:
+            from anthropic import AsyncAnthropic
+            self._async_client = AsyncAnthropic(
+                api_key=self.api_key, http_client=build_http_client(asynchronous=True)
+            )
+        return self._async_client
+
+    def _request_params(
         self,
         messages: List[Dict[str, str]],
-        **kwargs
-    ) -> LLMResponse:
-        """Send a chat completion request to Anthropic.
-
-        Args:
-            messages: List of message dicts with 'role' and 'content'
-            **kwargs: Additional parameters (temperature, max_tokens, etc.)
-
-        Returns:
-            LLMResponse object with the model's response
-        """
+        kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build messages.create() arguments, checking the API key first."""
         if not self.is_available():
             raise RuntimeError(
                 "Anthropic API key not configured. "
                 "Set ANTHROPIC_API_KEY environment variable or pass api_key."
             )
 
-        client = self._get_client()
-
         # Convert messages to Anthropic format
         system_message = None
         anthropic_messages = []
@@ -72,23 +91,97 @@ class AnthropicProvider(LLMProvider):
             else:
                 anthropic_messages.append(msg)
 
-        # Make API call
-        response = client.messages.create(
-            model=self.model,
-            max_tokens=kwargs.get("max_tokens", self.max_tokens),
-            messages=anthropic_messages,
-            system=system_message,
-            temperature=kwargs.get("temperature"),
-            top_p=kwargs.get("top_p"),
-            stop_sequences=kwargs.get("stop_sequences"),
-        )
+        # A cached system block lets repeated calls reuse the processed prefix;
+        # it only hits when the text is byte-identical, so normalize the tail
+        if (
+            system_message
+            and self.cache_system
+            and len(system_message) >= self.PROMPT_CACHE_MIN_CHARS
+        ):
+            system_message = [{
+                "type": "text",
+                "text": system_message.rstrip(),
+                "cache_control": {"type": "ephemeral"},
+            }]
+
+        # Unset parameters are left out rather than sent as explicit nulls
+        params = {**self._base_kwargs, "messages": anthropic_messages}
+        if system_message:
+            params["system"] = system_message
+        for name in self.OPTIONAL_PARAMS:
+            value = kwargs.get(name)
+            if value is not None:
+                params[name] = value
+        return params
+
+    @cached_response
+    def chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> LLMResponse:
+        """Send a chat completion request to Anthropic.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            LLMResponse object with the model's response
+        """
+        params = self._request_params(messages, kwargs)
+        response = self._get_client().messages.create(**params)
+        return self._to_response(response)
+
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream a chat completion from Anthropic.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
 
+        Yields:
+            Text deltas of the model's response
+        """
+        params = self._request_params(messages, kwargs)
+        with self._get_client().messages.stream(**params) as stream:
+            yield from stream.text_stream
+
+    @cached_response
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> LLMResponse:
+        """Send a chat completion request to Anthropic with the async client.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Returns:
+            LLMResponse object with the model's response
+        """
+        params = self._request_params(messages, kwargs)
+        response = await self._get_async_client().messages.create(**params)
+        return self._to_response(response)
+
+    def _to_response(self, response) -> LLMResponse:
+        """Convert an Anthropic message into an LLMResponse."""
         return LLMResponse(
             content=response.content[0].text,
             model=self.model,
             usage={
                 "input_tokens": response.usage.input_tokens,
                 "output_tokens": response.usage.output_tokens,
+                "cache_read_input_tokens":
+                    getattr(response.usage, "cache_read_input_tokens", None) or 0,
+                "cache_creation_input_tokens":
+                    getattr(response.usage, "cache_creation_input_tokens", None) or 0,
             },
             stop_reason=response.stop_reason,
             raw_response=response.model_dump(),
@@ -122,3 +215,15 @@ class AnthropicProvider(LLMProvider):
     def get_model_name(self) -> str:
         """Get the model name being used."""
         return self.model
+
+    def close(self) -> None:
+        """Close the client's connection pool."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
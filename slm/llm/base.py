@@ -1,10 +1,54 @@
 """Base LLM provider interface."""
 
+import asyncio
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import Optional, Dict, Any, List
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 from dataclasses import dataclass
 import os
 
+try:
+    import h2  # noqa: F401  (enables HTTP/2 in httpx)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool size for the cloud SDK HTTP clients
+HTTP_POOL_LIMIT = 100
+
+# Response cache defaults: entries kept and seconds before they expire
+RESPONSE_CACHE_SIZE = 256
+RESPONSE_CACHE_TTL = 3600.0
+
+
+def build_http_client(asynchronous: bool = False):
+    """Create a pooled httpx client for the provider SDKs.
+
+    Uses HTTP/2 when h2 is installed, so concurrent requests multiplex over
+    one TLS connection instead of each holding a socket.
+
+    Args:
+        asynchronous: Return an httpx.AsyncClient instead of httpx.Client
+
+    Returns:
+        The httpx client
+    """
+    import httpx
+
+    limits = httpx.Limits(
+        max_keepalive_connections=HTTP_POOL_LIMIT,
+        max_connections=HTTP_POOL_LIMIT,
+    )
+    client_class = httpx.AsyncClient if asynchronous else httpx.Client
+    return client_class(http2=HTTP2_AVAILABLE, limits=limits)
+
 
 @dataclass
 class LLMResponse:
@@ -16,6 +60,116 @@ class LLMResponse:
     raw_response: Optional[Dict[str, Any]] = None
 
 
+def extract_json_object(text: str) -> Optional[str]:
+    """Return the first balanced top-level JSON object embedded in text.
+
+    Single linear scan that tracks brace depth and skips over string
+    literals, so malformed model output cannot trigger regex backtracking.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        The JSON object substring, or None if no balanced object is found
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    escaped = False
+    for i in range(start, len(text)):
+        ch = text[i]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch == "{":
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                return text[start:i + 1]
+    return None
+
+
+class ResponseCache:
+    """Thread-safe LRU cache of LLM responses whose entries expire after ``ttl`` seconds.
+
+    Responses are copied on the way in and out, so a caller mutating the
+    LLMResponse it received can't alter what later callers get.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_SIZE, ttl: float = RESPONSE_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, LLMResponse]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires, response = entry
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(response)
+
+    def put(self, key: str, response: LLMResponse) -> None:
+        response = copy.deepcopy(response)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, response)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+def cached_response(method):
+    """Serve repeated deterministic chat requests from the provider's response cache.
+
+    Wraps a provider's ``chat``/``achat``; see LLMProvider.response_cache_key
+    for which requests are cached.
+    """
+    if inspect.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def async_wrapper(self, messages, **kwargs):
+            key = self.response_cache_key(messages, kwargs)
+            if key is not None and (cached := self.response_cache.get(key)) is not None:
+                return cached
+            response = await method(self, messages, **kwargs)
+            if key is not None:
+                self.response_cache.put(key, response)
+            return response
+        return async_wrapper
+
+    @functools.wraps(method)
+    def wrapper(self, messages, **kwargs):
+        key = self.response_cache_key(messages, kwargs)
+        if key is not None and (cached := self.response_cache.get(key)) is not None:
+            return cached
+        response = method(self, messages, **kwargs)
+        if key is not None:
+            self.response_cache.put(key, response)
+        return response
+    return wrapper
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
 
@@ -38,6 +192,38 @@ class LLMProvider(ABC):
         self.model = model
         self.base_url = base_url
         self.extra_kwargs = kwargs
+        self.cache_enabled = True
+        self.response_cache = ResponseCache()
+
+    def response_cache_key(
+        self,
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any]
+    ) -> Optional[str]:
+        """Return the response cache key for a request, or None to bypass the cache.
+
+        Only requests with an explicit temperature of 0 are cached. Without
+        one the provider samples at its default temperature, and sampled
+        responses are meant to vary between calls.
+        """
+        temperature = kwargs.get("temperature")
+        if not self.cache_enabled or temperature is None or temperature != 0:
+            return None
+        canonical = json.dumps(
+            {
+                "provider": type(self).__name__,
+                "model": self.get_model_name(),
+                "messages": messages,
+                "params": kwargs,
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+    def invalidate(self) -> None:
+        """Drop every cached response."""
+        self.response_cache.clear()
 
     @abstractmethod
     def chat(
@@ -73,6 +259,61 @@ class LLMProvider(ABC):
         """
         pass
 
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Iterator[str]:
+        """Send a chat completion request and yield the reply as it is generated.
+
+        Providers with a streaming API override this; the default yields the
+        whole chat() reply at once.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters
+
+        Yields:
+            Text deltas of the model's response
+        """
+        yield self.chat(messages, **kwargs).content
+
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> LLMResponse:
+        """Send a chat completion request without blocking the event loop.
+
+        Providers with a native async client override this; the default runs
+        the blocking chat() in a worker thread.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters
+
+        Returns:
+            LLMResponse object with the model's response
+        """
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    async def acomplete(
+        self,
+        prompt: str,
+        **kwargs
+    ) -> LLMResponse:
+        """Send a completion request without blocking the event loop.
+
+        Args:
+            prompt: The prompt to complete
+            **kwargs: Additional parameters
+
+        Returns:
+            LLMResponse object with the model's response
+        """
+        messages = [{"role": "user", "content": prompt}]
+        return await self.achat(messages, **kwargs)
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if the provider is available and properly configured.
@@ -86,6 +327,14 @@ class LLMProvider(ABC):
         """Get the model name being used."""
         return self.model or "unknown"
 
+    # Deliberately not abstract: providers without pooled connections have
+    # nothing to release and shouldn't be forced to override these
+    def close(self) -> None:  # noqa: B027
+        """Release network resources held by the provider (no-op by default)."""
+
+    async def aclose(self) -> None:  # noqa: B027
+        """Release async network resources held by the provider (no-op by default)."""
+
     @staticmethod
     def from_config(config: Dict[str, Any]) -> "LLMProvider":
         """Create a provider from configuration dict.
@@ -1,9 +1,14 @@
 """Ollama local LLM provider implementation."""
 
+import json
 import os
-import requests
-from typing import Optional, Dict, Any, List
-from slm.llm.base import LLMProvider, LLMResponse
+import httpx
+from typing import Optional, Dict, Any, Iterator, List
+from slm.llm.base import HTTP2_AVAILABLE, LLMProvider, LLMResponse, cached_response
+
+# Keep-alive connections held per client, and connect retries per request
+OLLAMA_KEEPALIVE = 8
+OLLAMA_RETRIES = 2
 
 
 class OllamaProvider(LLMProvider):
@@ -30,6 +35,19 @@ class OllamaProvider(LLMProvider):
         self.model = model or self.DEFAULT_MODEL
         self.extra_kwargs = kwargs
 
+        # One keep-alive client so repeated turns reuse TCP connections
+        self._client = httpx.Client(
+            base_url=self.endpoint,
+            timeout=120,
+            transport=httpx.HTTPTransport(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(max_keepalive_connections=OLLAMA_KEEPALIVE),
+                retries=OLLAMA_RETRIES,
+            ),
+        )
+        self._async_client = None
+
+    @cached_response
     def chat(
         self,
         messages: List[Dict[str, str]],
@@ -50,8 +68,96 @@ class OllamaProvider(LLMProvider):
                 "Make sure Ollama is running."
             )
 
-        url = f"{self.endpoint}/api/chat"
+        response = self._client.post("/api/chat", json=self._build_payload(messages, kwargs))
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama API error: {response.text}")
+
+        return self._to_response(response.json())
+
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream a chat completion from Ollama.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, options, etc.)
+
+        Yields:
+            Text deltas of the model's response
+        """
+        if not self.is_available():
+            raise RuntimeError(
+                f"Ollama not available at {self.endpoint}. "
+                "Make sure Ollama is running."
+            )
 
+        payload = self._build_payload(messages, kwargs)
+        payload["stream"] = True
+
+        # Ollama streams one JSON object per line
+        with self._client.stream("POST", "/api/chat", json=payload) as response:
+            if response.status_code != 200:
+                raise RuntimeError(f"Ollama API error: {response.read().decode(errors='replace')}")
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if "error" in data:
+                    raise RuntimeError(f"Ollama API error: {data['error']}")
+                content = data.get("message", {}).get("content")
+                if content:
+                    yield content
+
+    @cached_response
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> LLMResponse:
+        """Send a chat completion request to Ollama with an async HTTP client.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, options, etc.)
+
+        Returns:
+            LLMResponse object with the model's response
+        """
+        try:
+            response = await self._get_async_client().post(
+                "/api/chat", json=self._build_payload(messages, kwargs)
+            )
+        except httpx.TransportError as e:
+            raise RuntimeError(
+                f"Ollama not available at {self.endpoint}. "
+                "Make sure Ollama is running."
+            ) from e
+
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama API error: {response.text}")
+
+        return self._to_response(response.json())
+
+    def _get_async_client(self):
+        """Get or create the cached async HTTP client."""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(
+                base_url=self.endpoint,
+                timeout=120,
+                transport=httpx.AsyncHTTPTransport(
+                    http2=HTTP2_AVAILABLE,
+                    limits=httpx.Limits(max_keepalive_connections=OLLAMA_KEEPALIVE),
+                    retries=OLLAMA_RETRIES,
+                ),
+            )
+        return self._async_client
+
+    def _build_payload(self, messages: List[Dict[str, str]], kwargs: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the /api/chat request body."""
         payload = {
             "model": self.model,
             "messages": messages,
@@ -64,13 +170,10 @@ class OllamaProvider(LLMProvider):
             options["temperature"] = kwargs["temperature"]
             payload["options"] = options
 
-        response = requests.post(url, json=payload, timeout=120)
-
-        if response.status_code != 200:
-            raise RuntimeError(f"Ollama API error: {response.text}")
-
-        data = response.json()
+        return payload
 
+    def _to_response(self, data: Dict[str, Any]) -> LLMResponse:
+        """Convert an /api/chat response body into an LLMResponse."""
         return LLMResponse(
             content=data.get("message", {}).get("content", ""),
             model=self.model,
@@ -103,15 +206,25 @@ class OllamaProvider(LLMProvider):
             True if Ollama is running and accessible, False otherwise
         """
         try:
-            response = requests.get(f"{self.endpoint}/api/tags", timeout=5)
+            response = self._client.get("/api/tags", timeout=2)
             return response.status_code == 200
-        except requests.RequestException:
+        except httpx.HTTPError:
             return False
 
     def get_model_name(self) -> str:
         """Get the model name being used."""
         return self.model
 
+    def close(self) -> None:
+        """Close the pooled HTTP connections."""
+        self._client.close()
+
+    async def aclose(self) -> None:
+        """Close the async client's pooled connections."""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
     def list_models(self) -> List[str]:
         """List available models in Ollama.
 
@@ -119,10 +232,10 @@ class OllamaProvider(LLMProvider):
             List of model names
         """
         try:
-            response = requests.get(f"{self.endpoint}/api/tags", timeout=5)
+            response = self._client.get("/api/tags", timeout=5)
             if response.status_code == 200:
                 data = response.json()
                 return [m["name"] for m in data.get("models", [])]
-        except requests.RequestException:
+        except httpx.HTTPError:
             pass
         return []
@@ -1,8 +1,9 @@
 """OpenAI provider implementation."""
 
+import importlib.util
 import os
-from typing import Optional, Dict, Any, List
-from slm.llm.base import LLMProvider, LLMResponse
+from typing import Optional, Dict, Any, Iterator, List
+from slm.llm.base import LLMProvider, LLMResponse, build_http_client, cached_response
 
 
 class OpenAIProvider(LLMProvider):
@@ -10,6 +11,9 @@ class OpenAIProvider(LLMProvider):
 
     DEFAULT_MODEL = "gpt-4o"
 
+    # Per-call parameters forwarded to the API when set (None means unset)
+    OPTIONAL_PARAMS = ("max_tokens", "temperature", "top_p", "stop")
+
     def __init__(
         self,
         api_key: Optional[str] = None,
@@ -33,20 +37,67 @@ class OpenAIProvider(LLMProvider):
         self.base_url = base_url
         self.max_tokens = max_tokens
         self.extra_kwargs = kwargs
+        self._client = None
+        self._async_client = None
 
-    def _get_client(self):
-        """Get or create OpenAI client."""
-        try:
-            from openai import OpenAI
+        # Request arguments shared by every call
+        self._base_kwargs = {"model": self.model, "max_tokens": self.max_tokens}
 
-            if self.base_url:
-                return OpenAI(api_key=self.api_key, base_url=self.base_url)
-            return OpenAI(api_key=self.api_key)
-        except ImportError:
+        # Fail at construction rather than on the first chat() call
+        if self.api_key and importlib.util.find_spec("openai") is None:
             raise ImportError(
                 "OpenAI SDK not installed. Install with: pip install openai"
             )
 
+    def _get_client(self):
+        """Get or create the cached OpenAI client."""
+        if self._client is None:
+            from openai import OpenAI
+            if self.base_url:
+                self._client = OpenAI(
+                    api_key=self.api_key, base_url=self.base_url,
+                    http_client=build_http_client()
+                )
+            else:
+                self._client = OpenAI(api_key=self.api_key, http_client=build_http_client())
+        return self._client
+
+    def _get_async_client(self):
+        """Get or create the cached async OpenAI client."""
+        if self._async_client is None:
+            from openai import AsyncOpenAI
+            if self.base_url:
+                self._async_client = AsyncOpenAI(
+                    api_key=self.api_key, base_url=self.base_url,
+                    http_client=build_http_client(asynchronous=True)
+                )
+            else:
+                self._async_client = AsyncOpenAI(
+                    api_key=self.api_key, http_client=build_http_client(asynchronous=True)
+                )
+        return self._async_client
+
+    def _request_params(
+        self,
+        messages: List[Dict[str, str]],
+        kwargs: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Build chat.completions.create() arguments, checking the API key first."""
+        if not self.is_available():
+            raise RuntimeError(
+                "OpenAI API key not configured. "
+                "Set OPENAI_API_KEY environment variable or pass api_key."
+            )
+
+        # Unset parameters are left out rather than sent as explicit nulls
+        params = {**self._base_kwargs, "messages": messages}
+        for name in self.OPTIONAL_PARAMS:
+            value = kwargs.get(name)
+            if value is not None:
+                params[name] = value
+        return params
+
+    @cached_response
     def chat(
         self,
         messages: List[Dict[str, str]],
@@ -61,24 +112,50 @@ class OpenAIProvider(LLMProvider):
         Returns:
             LLMResponse object with the model's response
         """
-        if not self.is_available():
-            raise RuntimeError(
-                "OpenAI API key not configured. "
-                "Set OPENAI_API_KEY environment variable or pass api_key."
-            )
+        params = self._request_params(messages, kwargs)
+        response = self._get_client().chat.completions.create(**params)
+        return self._to_response(response)
 
-        client = self._get_client()
+    def stream_chat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> Iterator[str]:
+        """Stream a chat completion from OpenAI.
 
-        # Make API call
-        response = client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            max_tokens=kwargs.get("max_tokens", self.max_tokens),
-            temperature=kwargs.get("temperature"),
-            top_p=kwargs.get("top_p"),
-            stop=kwargs.get("stop"),
-        )
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
+
+        Yields:
+            Text deltas of the model's response
+        """
+        params = self._request_params(messages, kwargs)
+        for chunk in self._get_client().chat.completions.create(**params, stream=True):
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    @cached_response
+    async def achat(
+        self,
+        messages: List[Dict[str, str]],
+        **kwargs
+    ) -> LLMResponse:
+        """Send a chat completion request to OpenAI with the async client.
+
+        Args:
+            messages: List of message dicts with 'role' and 'content'
+            **kwargs: Additional parameters (temperature, max_tokens, etc.)
 
+        Returns:
+            LLMResponse object with the model's response
+        """
+        params = self._request_params(messages, kwargs)
+        response = await self._get_async_client().chat.completions.create(**params)
+        return self._to_response(response)
+
+    def _to_response(self, response) -> LLMResponse:
+        """Convert an OpenAI chat completion into an LLMResponse."""
         return LLMResponse(
             content=response.choices[0].message.content or "",
             model=response.model,
@@ -119,3 +196,15 @@ class OpenAIProvider(LLMProvider):
     def get_model_name(self) -> str:
         """Get the model name being used."""
         return self.model
+
+    def close(self) -> None:
+        """Close the client's connection pool."""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self) -> None:
+        """Close the async client's connection pool."""
+        if self._async_client is not None:
+            await self._async_client.close()
+            self._async_client = None
@@ -0,0 +1,74 @@
+"""Prompt templates shared by the CLI and the API."""
+
+from typing import Dict, List
+
+# Static instructions go in the system message so the prefix is byte-identical
+# across requests and can be served from provider-side prompt caches.
+ANALYSIS_SYSTEM_PROMPT = """You are a cybersecurity expert analyzing security tool output.
+
+Analyze the log output you are given and provide:
+1. Severity assessment (critical, high, medium, low, info)
+2. Key findings (list of security issues discovered)
+3. Recommendations (actionable steps to address issues)
+
+Provide your analysis in JSON format:
+{
+    "severity": "...",
+    "findings": ["..."],
+    "recommendations": ["..."]
+}"""
+
+# Log analysis should give the same verdict for the same log, and a fixed
+# temperature of 0 lets providers serve repeats from their response cache
+ANALYSIS_TEMPERATURE = 0
+
+ANALYSIS_USER_TEMPLATE = """Analyze these {log_type} scan results.
+
+Log content:
+```{content}
+```"""
+
+TERMINAL_SYSTEM_PROMPT = """You are CyberLab Assistant, a cybersecurity expert helping a user at their terminal.
+
+Answer questions and explain security tools, findings and commands concisely.
+When suggesting commands, put them in a code block and explain what they do.
+Only suggest actions against systems the user is authorized to test."""
+
+TERMINAL_USER_TEMPLATE = """Environment: {platform}, working directory {cwd}
+
+{command}"""
+
+
+def build_analysis_messages(log_type: str, content: str) -> List[Dict[str, str]]:
+    """Build the chat messages for a security log analysis request.
+
+    Args:
+        log_type: Tool that produced the log (nmap, nikto, ...)
+        content: Raw log content
+
+    Returns:
+        List of message dicts with 'role' and 'content'
+    """
+    return [
+        {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+        {"role": "user", "content": ANALYSIS_USER_TEMPLATE.format(log_type=log_type, content=content)},
+    ]
+
+
+def build_terminal_messages(command: str, platform: str, cwd: str) -> List[Dict[str, str]]:
+    """Build the chat messages for an interactive terminal request.
+
+    Args:
+        command: The user's natural language input
+        platform: Platform the terminal runs on (sys.platform)
+        cwd: Current working directory
+
+    Returns:
+        List of message dicts with 'role' and 'content'
+    """
+    return [
+        {"role": "system", "content": TERMINAL_SYSTEM_PROMPT},
+        {"role": "user", "content": TERMINAL_USER_TEMPLATE.format(
+            platform=platform, cwd=cwd, command=command
+        )},
+    ]
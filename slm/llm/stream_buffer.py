@@ -0,0 +1,59 @@
+"""Coalescing of streamed LLM tokens into larger writes."""
+
+import time
+from typing import Iterable, Iterator, List
+
+# Defaults: flush once this many bytes are buffered or this many seconds have
+# passed since the last flush, whichever comes first
+STREAM_FLUSH_BYTES = 8192
+STREAM_FLUSH_INTERVAL = 0.025
+
+
+class StreamBuffer:
+    """Group streamed text deltas so the output is written in fewer, larger chunks.
+
+    Providers can yield one delta per token; writing and flushing each one
+    costs a syscall per token. Wrapping the stream yields joined chunks
+    instead, still often enough that output keeps appearing live.
+    """
+
+    def __init__(
+        self,
+        flush_bytes: int = STREAM_FLUSH_BYTES,
+        flush_interval_s: float = STREAM_FLUSH_INTERVAL
+    ):
+        """Initialize the buffer.
+
+        Args:
+            flush_bytes: Emit a chunk once this many UTF-8 bytes are buffered
+            flush_interval_s: Emit a chunk once this many seconds have passed
+                since the previous one
+        """
+        self.flush_bytes = flush_bytes
+        self.flush_interval_s = flush_interval_s
+
+    def wrap(self, tokens: Iterable[str]) -> Iterator[str]:
+        """Yield ``tokens`` joined into chunks; anything left is flushed at the end.
+
+        Args:
+            tokens: Text deltas, e.g. from LLMProvider.stream_chat()
+
+        Yields:
+            Concatenated text chunks
+        """
+        parts: List[str] = []
+        size = 0
+        last_flush = time.monotonic()
+
+        for token in tokens:
+            parts.append(token)
+            size += len(token.encode("utf-8"))
+            now = time.monotonic()
+            if size >= self.flush_bytes or now - last_flush >= self.flush_interval_s:
+                yield "".join(parts)
+                parts.clear()
+                size = 0
+                last_flush = now
+
+        if parts:
+            yield "".join(parts)
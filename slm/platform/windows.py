@@ -2,7 +2,9 @@
 
 import sys
 import os
+import shutil
 import subprocess
+from functools import lru_cache
 from typing import Optional, List, Dict, Any
 
 
@@ -32,6 +34,37 @@ TOOL_EQUIVALENTS = {
 }
 
 
+def _post_ls(parts: List[str], command: str) -> None:
+    # Add /b for bare format
+    if "/l" not in command and "-l" not in command:
+        parts.append("/b")
+
+
+def _post_rm(parts: List[str], command: str) -> None:
+    # Add /f /s for recursive force delete
+    if "-rf" in command or "-r" in command:
+        parts[1:1] = ["/s", "/f"]
+
+
+def _post_ps(parts: List[str], command: str) -> None:
+    # tasklist with format
+    parts.extend(["/fo", "csv", "/nh"])
+
+
+def _post_grep(parts: List[str], command: str) -> None:
+    # findstr is case-insensitive with /i
+    parts.insert(1, "/i")
+
+
+# Argument fix-ups applied after a command name has been translated
+_POST_CONVERT = {
+    "ls": _post_ls,
+    "rm": _post_rm,
+    "ps": _post_ps,
+    "grep": _post_grep,
+}
+
+
 def convert_command(command: str) -> str:
     """Convert a Unix-style command to Windows equivalent.
 
@@ -52,33 +85,23 @@ def convert_command(command: str) -> str:
 
     # Check if the command has an equivalent
     cmd_name = parts[0].lower()
-    if cmd_name in TOOL_EQUIVALENTS:
-        # Replace command name
-        parts[0] = TOOL_EQUIVALENTS[cmd_name]
-
-        # Handle special cases
-        if cmd_name == "ls":
-            # Add /b for bare format
-            if "/l" not in command and "-l" not in command:
-                parts.append("/b")
-        elif cmd_name == "rm":
-            # Add /f /s for recursive force delete
-            if "-rf" in command or "-r" in command:
-                parts.insert(1, "/s")
-                parts.insert(2, "/f")
-        elif cmd_name == "ps":
-            # tasklist with format
-            parts.extend(["/fo", "csv", "/nh"])
-        elif cmd_name == "grep":
-            # findstr is case-insensitive with /i
-            parts.insert(1, "/i")
+    equivalent = TOOL_EQUIVALENTS.get(cmd_name)
+    if equivalent is not None:
+        # Replace command name, then handle special cases
+        parts[0] = equivalent
+        post = _POST_CONVERT.get(cmd_name)
+        if post is not None:
+            post(parts, command)
 
     return " ".join(parts)
 
 
+@lru_cache(maxsize=1)
 def get_powershell_version() -> Optional[str]:
     """Get PowerShell version if available.
 
+    The result is cached, so PowerShell is launched at most once per process.
+
     Returns:
         PowerShell version string or None
     """
@@ -146,9 +169,14 @@ def enable_ansi_support() -> bool:
         return False
 
 
+@lru_cache(maxsize=128)
 def get_tool_path(tool_name: str) -> Optional[str]:
     """Get the full path to a tool if available on Windows.
 
+    Searches PATH (with PATHEXT) in-process instead of spawning where.exe.
+    Results are cached; call ``get_tool_path.cache_clear()`` after
+    installing tools.
+
     Args:
         tool_name: Name of the tool
 
@@ -158,20 +186,7 @@ def get_tool_path(tool_name: str) -> Optional[str]:
     if sys.platform != "win32":
         return None
 
-    # Check if tool is in PATH
-    try:
-        result = subprocess.run(
-            ["where", tool_name],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            return result.stdout.strip().split("\n")[0]
-    except Exception:
-        pass
-
-    return None
+    return shutil.which(tool_name)
 
 
 def check_tool_available(tool_name: str) -> bool:
@@ -2,20 +2,62 @@ import sys
 import os
 from pathlib import Path
 import subprocess
+import selectors
 import json
 import threading
 import queue
-from typing import Optional, Dict, Any
+from typing import TYPE_CHECKING, Optional, Dict, Any
 import signal
-import torch
+
+# torch is imported where the local model is used, so provider-only sessions
+# don't pay its import time and memory
+if TYPE_CHECKING:
+    from slm.cyberlab.model import CyberLabSLM
+    from slm.cyberlab.preprocessing import TokenizerWrapper
+    from slm.llm.base import LLMProvider
+
+# Model replies are parsed with orjson when available. The model input stays
+# on json.dumps: its separators and ASCII escaping are the format the model
+# was trained on, which orjson can't reproduce
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+# Environment variables included in the model's system context; the rest of
+# the environment is per-session noise (and may hold secrets)
+CONTEXT_ENV_VARS = ("PATH", "SHELL", "USER", "HOME", "LANG", "TERM", "VIRTUAL_ENV")
+
+# Bytes read from a command's stdout/stderr pipe per wakeup
+OUTPUT_READ_SIZE = 65536
 
 class TerminalInterface:
-    def __init__(self, model, tokenizer, command_queue: queue.Queue):
+    def __init__(
+        self,
+        model: Optional["CyberLabSLM"],
+        tokenizer: Optional["TokenizerWrapper"],
+        command_queue: queue.Queue,
+        llm_provider: Optional["LLMProvider"] = None
+    ):
         self.model = model
         self.tokenizer = tokenizer
         self.command_queue = command_queue
+        self.llm_provider = llm_provider
         self.running = True
         self.last_context = {}
+        self._static_context = self._build_static_context()
+        
+        # Reusable model input buffer (pinned so GPU copies can be async)
+        self._input_buf = None
+        if model is not None:
+            import torch
+            
+            model.eval()
+            self._device = next(model.parameters()).device
+            self._input_buf = torch.empty(
+                (1, model.max_seq_length), dtype=torch.long,
+                pin_memory=self._device.type == "cuda"
+            )
         
     def start(self):
         """Start the terminal interface."""
@@ -70,6 +112,12 @@ class TerminalInterface:
     
     def _handle_command(self, command: str):
         """Handle a natural language command."""
+        if self.llm_provider is not None:
+            self._stream_llm_reply(command)
+            return
+        
+        import torch
+        
         # Get current system context
         context = self._get_system_context()
         
@@ -83,14 +131,19 @@ class TerminalInterface:
         # Tokenize input
         tokens = self.tokenizer.encode(input_text)
         
+        # Keep the leading tokens (the command and context) if the input is too long
+        tokens = tokens[:self._input_buf.size(1)]
+        input_ids = self._input_buf[:, :len(tokens)]
+        input_ids[0].copy_(torch.as_tensor(tokens))
+        
         # Get model prediction
-        with torch.no_grad():
-            output = self.model.forward(torch.tensor([tokens]))
-            response = self.tokenizer.decode(output.argmax(dim=-1).tolist()[0])
+        with torch.inference_mode():
+            output = self.model(input_ids.to(self._device, non_blocking=True))
+            response = self.tokenizer.decode(output[0].argmax(dim=-1).tolist())
         
         try:
             # Parse response
-            action = json.loads(response)
+            action = _json_loads(response)
             
             if "command" in action:
                 # Execute system command
@@ -107,64 +160,133 @@ class TerminalInterface:
         # Update last context
         self.last_context = context
     
+    def _stream_llm_reply(self, command: str):
+        """Print the LLM provider's reply as it is generated."""
+        from slm.llm.prompts import build_terminal_messages
+        from slm.llm.stream_buffer import StreamBuffer
+        
+        messages = build_terminal_messages(command, sys.platform, os.getcwd())
+        # Coalesce per-token deltas so stdout is written in fewer, larger chunks
+        for text in StreamBuffer().wrap(self.llm_provider.stream_chat(messages)):
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        sys.stdout.write("\n")
+        sys.stdout.flush()
+    
     def _get_system_context(self) -> Dict[str, Any]:
         """Get current system context."""
+        return {
+            **self._static_context,
+            "cwd": os.getcwd(),
+            "env": {name: os.environ[name] for name in CONTEXT_ENV_VARS if name in os.environ}
+        }
+    
+    @staticmethod
+    def _build_static_context() -> Dict[str, Any]:
+        """Collect the parts of the system context that can't change during a session."""
         context = {
             "os": os.name,
-            "platform": sys.platform,
-            "cwd": os.getcwd(),
-            "env": dict(os.environ)
+            "platform": sys.platform
         }
         
-        # Add system-specific information
+        # Add system-specific information (struct sequences, not namedtuples)
         if sys.platform == "win32":
             # Windows-specific context
-            context.update({
-                "windows_version": sys.getwindowsversion()._asdict()
-            })
-        else:
+            version = sys.getwindowsversion()
+            context["windows_version"] = {
+                field: getattr(version, field)
+                for field in ("major", "minor", "build", "platform", "service_pack")
+            }
+        elif hasattr(os, "uname"):
             # Unix-like system context
-            try:
-                context.update({
-                    "uname": os.uname()._asdict()
-                })
-            except AttributeError:
-                pass
+            uname = os.uname()
+            context["uname"] = {
+                field: getattr(uname, field)
+                for field in ("sysname", "nodename", "release", "version", "machine")
+            }
         
         return context
     
     def _execute_command(self, command: str):
         """Execute a system command."""
         try:
-            # Run command and capture output
+            # Run command and capture output (bytes; decoded per line)
             process = subprocess.Popen(
                 command,
                 shell=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
-                text=True
+                bufsize=0
             )
             
-            # Stream output in real-time
-            while True:
-                output = process.stdout.readline()
-                if output == '' and process.poll() is not None:
-                    break
-                if output:
-                    print(output.strip())
+            # Stream both pipes in real-time so a chatty stderr can't fill
+            # its pipe buffer and stall the child
+            if sys.platform == "win32":
+                self._stream_output_threaded(process)
+            else:
+                self._stream_output_selector(process)
             
             # Get return code
-            return_code = process.poll()
+            return_code = process.wait()
             
             if return_code != 0:
-                # Print error if command failed
-                error = process.stderr.read()
-                print(f"Error (code {return_code}):")
-                print(error)
+                print(f"Error (code {return_code})")
                 
         except subprocess.SubprocessError as e:
             print(f"Failed to execute command: {str(e)}")
     
+    @staticmethod
+    def _print_output_line(line: bytes, is_stderr: bool):
+        """Print one line of command output, tagging lines from stderr."""
+        text = line.decode("utf-8", errors="replace").rstrip()
+        print(f"[stderr] {text}" if is_stderr else text)
+    
+    def _stream_output_selector(self, process: subprocess.Popen):
+        """Print stdout and stderr as they arrive, multiplexed with a selector (POSIX)."""
+        pending = {process.stdout: b"", process.stderr: b""}
+        with selectors.DefaultSelector() as sel:
+            sel.register(process.stdout, selectors.EVENT_READ, False)
+            sel.register(process.stderr, selectors.EVENT_READ, True)
+            
+            while sel.get_map():
+                for key, _ in sel.select(timeout=0.1):
+                    stream, is_stderr = key.fileobj, key.data
+                    chunk = os.read(key.fd, OUTPUT_READ_SIZE)
+                    if not chunk:
+                        # EOF: flush an unterminated last line
+                        sel.unregister(stream)
+                        if pending[stream]:
+                            self._print_output_line(pending[stream], is_stderr)
+                        continue
+                    
+                    *lines, pending[stream] = (pending[stream] + chunk).split(b"\n")
+                    for line in lines:
+                        self._print_output_line(line, is_stderr)
+    
+    def _stream_output_threaded(self, process: subprocess.Popen):
+        """Print stdout and stderr as they arrive, read by one thread per pipe.
+        
+        Windows pipes can't be used with select(), so each stream is drained
+        line by line into a shared queue that this thread prints from.
+        """
+        lines: queue.Queue = queue.Queue()
+        
+        def drain(stream, is_stderr: bool):
+            for line in iter(stream.readline, b""):
+                lines.put((line, is_stderr))
+            lines.put(None)
+        
+        for stream, is_stderr in ((process.stdout, False), (process.stderr, True)):
+            threading.Thread(target=drain, args=(stream, is_stderr), daemon=True).start()
+        
+        open_streams = 2
+        while open_streams:
+            item = lines.get()
+            if item is None:
+                open_streams -= 1
+            else:
+                self._print_output_line(*item)
+    
     def _display_analysis(self, analysis: Dict[str, Any]):
         """Display analysis results."""
         print("\nAnalysis Results:")
@@ -185,30 +307,50 @@ class TerminalInterface:
         print("-" * 20)
 
 def main():
-    import torch
-    from slm.cyberlab.model import CyberLabSLM
-    from slm.cyberlab.preprocessing import TokenizerWrapper
     import yaml
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader
     
     # Load configuration
     with open("config/config.yaml") as f:
-        config = yaml.safe_load(f)
+        config = yaml.load(f, Loader=SafeLoader)
     
-    # Initialize components
-    tokenizer = TokenizerWrapper(config['tokenizer']['model_path'])
-    model = CyberLabSLM(vocab_size=tokenizer.vocab_size, **config['model'])
+    # Opt-in chat mode: stream the LLM provider's replies instead of running
+    # the local model (chat replies are only printed, never executed)
+    llm_provider = None
+    if config.get('terminal', {}).get('llm_chat', False) and config.get('llm'):
+        from slm.llm.base import LLMProvider
+        try:
+            llm_provider = LLMProvider.from_config(config['llm'])
+            if not llm_provider.is_available():
+                llm_provider = None
+        except Exception as e:
+            print(f"Warning: LLM provider unavailable, using local model: {e}")
+            llm_provider = None
     
-    # Load model weights
-    model_path = Path(config['model']['weights_path'])
-    if model_path.exists():
-        model.load_state_dict(torch.load(model_path))
-    model.eval()
+    # The local model is only needed (and torch only imported) without a provider
+    model = tokenizer = None
+    if llm_provider is None:
+        from slm.cyberlab.model import CyberLabSLM
+        from slm.cyberlab.preprocessing import TokenizerWrapper
+        
+        # Initialize components and load saved weights
+        tokenizer = TokenizerWrapper(config['tokenizer']['model_path'])
+        model = CyberLabSLM.from_config(tokenizer.vocab_size, config['model'])
+        model.eval()
+        
+        # The terminal runs the model on CPU; int8 weights halve the weight
+        # traffic of every turn
+        if config.get('inference', {}).get('quantize_cpu', False):
+            model = model.to_quantized()
     
     # Create command queue
     command_queue = queue.Queue()
     
     # Create and start terminal interface
-    terminal = TerminalInterface(model, tokenizer, command_queue)
+    terminal = TerminalInterface(model, tokenizer, command_queue, llm_provider)
     
     def signal_handler(signum, frame):
         print("\nReceived shutdown signal...")
@@ -219,7 +361,11 @@ def main():
     signal.signal(signal.SIGTERM, signal_handler)
     
     # Start interface
-    terminal.start()
+    try:
+        terminal.start()
+    finally:
+        if llm_provider is not None:
+            llm_provider.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,33 @@
+import pytest
+
+from slm.llm.anthropic import AnthropicProvider
+from slm.llm.prompts import ANALYSIS_SYSTEM_PROMPT
+
+
+@pytest.fixture(autouse=True)
+def no_api_key(monkeypatch):
+    monkeypatch.delenv("ANTHROPIC_API_KEY", raising=False)
+
+
+def _system_param(system_prompt):
+    # Constructed without a key so the SDK needn't be installed; requests
+    # are only built here, never sent
+    provider = AnthropicProvider(api_key="")
+    provider.api_key = "test-key"
+    params = provider._request_params(
+        [{"role": "system", "content": system_prompt}, {"role": "user", "content": "hi"}],
+        {}
+    )
+    return params["system"]
+
+
+def test_short_system_prompt_is_sent_without_cache_control():
+    assert _system_param(ANALYSIS_SYSTEM_PROMPT) == ANALYSIS_SYSTEM_PROMPT
+
+
+def test_long_system_prompt_is_marked_for_caching():
+    long_prompt = "x" * AnthropicProvider.PROMPT_CACHE_MIN_CHARS
+
+    system = _system_param(long_prompt)
+
+    assert system[0]["cache_control"] == {"type": "ephemeral"}
@@ -0,0 +1,43 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from slm.api import main
+
+
+def _batch(count):
+    return main.BatchAnalysisRequest(
+        items=[main.AnalysisRequest(content=f"log {i}", log_type="nmap") for i in range(count)]
+    )
+
+
+def test_batch_rejects_oversized_requests(monkeypatch):
+    monkeypatch.setattr(main, "MAX_BATCH_SIZE", 4)
+
+    with pytest.raises(HTTPException) as excinfo:
+        asyncio.run(main.analyze_batch(_batch(5)))
+
+    assert excinfo.value.status_code == 413
+
+
+def test_batch_bounds_llm_concurrency(monkeypatch):
+    running = 0
+    peak = 0
+
+    async def fake_analyze(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return main.AnalysisResponse(analysis={}, recommendations=[], severity="low")
+
+    monkeypatch.setattr(main, "BATCH_CONCURRENCY", 3)
+    monkeypatch.setattr(main, "_llm_available", lambda: True)
+    monkeypatch.setattr(main, "_aanalyze_with_llm", fake_analyze)
+
+    results = asyncio.run(main.analyze_batch(_batch(10)))
+
+    assert len(results) == 10
+    assert peak == 3
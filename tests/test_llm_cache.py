@@ -0,0 +1,43 @@
+from slm.llm.base import LLMProvider, LLMResponse, cached_response
+
+
+class CountingProvider(LLMProvider):
+    def __init__(self):
+        super().__init__(api_key="test", model="test-model")
+        self.calls = []
+
+    @cached_response
+    def chat(self, messages, **kwargs):
+        self.calls.append(kwargs)
+        return LLMResponse(content=f'{{"severity": "low", "call": {len(self.calls)}}}', model=self.model)
+
+    def complete(self, prompt, **kwargs):
+        return self.chat([{"role": "user", "content": prompt}], **kwargs)
+
+    def is_available(self):
+        return True
+
+
+def test_analysis_requests_hit_the_response_cache(monkeypatch):
+    from slm.api import main
+
+    provider = CountingProvider()
+    monkeypatch.setattr(main, "LLM_PROVIDER", provider)
+    request = main.AnalysisRequest(content="22/tcp open ssh", log_type="nmap")
+
+    first = main._analyze_with_llm(request)
+    second = main._analyze_with_llm(request)
+
+    assert len(provider.calls) == 1
+    assert provider.calls[0]["temperature"] == 0
+    assert first == second
+
+
+def test_sampled_requests_bypass_the_response_cache():
+    provider = CountingProvider()
+    messages = [{"role": "user", "content": "hello"}]
+
+    provider.chat(messages)
+    provider.chat(messages, temperature=0.7)
+
+    assert len(provider.calls) == 2
@@ -0,0 +1,44 @@
+import os
+import time
+
+from agents import metatron
+
+SCAN_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<!DOCTYPE nmaprun>
+<nmaprun scanner="nmap" start="{start}" startstr="{startstr}">
+<host starttime="{start}" endtime="{end}"><status state="up"/>
+<address addr="10.0.0.5" addrtype="ipv4"/>
+<ports>
+<port protocol="tcp" portid="80"><state state="open"/><service name="http"/></port>
+<port protocol="tcp" portid="22"><state state="open"/><service name="ssh"/></port>
+</ports>
+<times srtt="{srtt}" rttvar="100" to="100000"/>
+</host>
+<runstats><finished time="{end}" elapsed="{elapsed}"/></runstats>
+</nmaprun>
+"""
+
+
+def test_scan_signature_ignores_run_timing():
+    first = SCAN_XML.format(start=1700000000, startstr="Tue Nov 14", end=1700000004,
+                            srtt=512, elapsed="4.01")
+    second = SCAN_XML.format(start=1700009999, startstr="Wed Nov 15", end=1700010010,
+                             srtt=733, elapsed="11.37")
+
+    assert first != second
+    assert metatron._scan_signature(first) == metatron._scan_signature(second)
+    assert "ssh" in metatron._scan_signature(first)
+
+
+def test_cache_put_prunes_expired_entries(tmp_path, monkeypatch):
+    monkeypatch.setattr(metatron, "LLM_CACHE_DIR", tmp_path)
+    expired = tmp_path / "expired.json"
+    expired.write_text('{"content": "old"}')
+    old = time.time() - metatron.LLM_CACHE_TTL - 60
+    os.utime(expired, (old, old))
+
+    metatron._cache_put("fresh", "new")
+
+    assert not expired.exists()
+    assert metatron._cache_get("fresh") == "new"
+    assert (tmp_path / "fresh.json").exists()
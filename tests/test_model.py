@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+import yaml
+
+torch = pytest.importorskip("torch")
+
+from slm.cyberlab.model import CyberLabSLM
+
+CONFIG_PATH = Path(__file__).resolve().parent.parent / "slm" / "config" / "config.yaml"
+
+
+def _model_config():
+    with open(CONFIG_PATH) as f:
+        return yaml.safe_load(f)["model"]
+
+
+def test_from_config_builds_model_from_shipped_config():
+    model_config = _model_config()
+    assert "weights_path" in model_config
+
+    model = CyberLabSLM.from_config(100, model_config, load=False).eval()
+
+    assert model.max_seq_length == model_config["max_seq_length"]
+    with torch.inference_mode():
+        output = model(torch.zeros((1, 8), dtype=torch.long))
+    assert output.shape == (1, 8, 100)
+
+
+def test_from_config_loads_saved_weights(tmp_path):
+    model_config = dict(_model_config(), d_model=16, nhead=2, num_layers=1,
+                        dim_feedforward=32, max_seq_length=8)
+    model_config["weights_path"] = str(tmp_path / "model.pt")
+    saved = CyberLabSLM.from_config(50, model_config, load=False)
+    torch.save(saved.state_dict(), model_config["weights_path"])
+
+    loaded = CyberLabSLM.from_config(50, model_config)
+
+    assert torch.equal(loaded.embedding.weight, saved.embedding.weight)
+    assert loaded.output_head.weight is loaded.embedding.weight
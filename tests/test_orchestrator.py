@@ -0,0 +1,61 @@
+import json
+import threading
+
+import pytest
+
+from slm.cyberlab.kali_tools import orchestrator as orchestrator_module
+from slm.cyberlab.kali_tools import tool_manager
+from slm.cyberlab.kali_tools.orchestrator import KaliToolOrchestrator
+
+
+@pytest.fixture
+def orchestrator(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_manager, "TOOL_PATHS_CACHE", tmp_path / "tool_paths.json")
+    monkeypatch.setattr(orchestrator_module, "WORKFLOWS_CACHE", tmp_path / "workflows.json")
+    return KaliToolOrchestrator()
+
+
+def test_workflows_are_cached_as_json(orchestrator, tmp_path):
+    cached = json.loads((tmp_path / "workflows.json").read_text())
+
+    assert cached["workflows"] == orchestrator.workflows
+    assert orchestrator._load_workflows() == orchestrator.workflows
+
+
+def test_parallel_web_analysis_overlaps_nmap_steps(orchestrator, monkeypatch):
+    nikto_started = threading.Event()
+    overlapped = []
+
+    def nmap_scan(target, options):
+        # Only returns early if nikto runs while this nmap step is still going
+        overlapped.append(nikto_started.wait(timeout=5))
+        return {"success": True}
+
+    def nikto_scan(target, options):
+        nikto_started.set()
+        return {"success": True}
+
+    monkeypatch.setattr(orchestrator.info_gathering, "nmap_scan", nmap_scan)
+    monkeypatch.setattr(orchestrator.web_analysis, "nikto_scan", nikto_scan)
+    monkeypatch.setattr(orchestrator.web_analysis, "sqlmap_scan", lambda target, options: {"success": True})
+
+    result = orchestrator.execute_workflow("full_recon", "10.0.0.1")
+
+    assert result["success"]
+    assert overlapped and overlapped[0] is True
+    assert [step["name"] for step in result["results"]["steps"]] == [
+        "Host Discovery", "Port Scan", "Service Enumeration", "Web Analysis", "SQL Injection Check"
+    ]
+
+
+def test_steps_run_in_order_by_default(orchestrator, monkeypatch):
+    order = []
+    monkeypatch.setattr(orchestrator.info_gathering, "nmap_scan",
+                        lambda target, options: order.append(options[0]) or {"success": True})
+    monkeypatch.setattr(orchestrator.password_attacks, "hydra_attack",
+                        lambda target, service, options: order.append("hydra") or {"success": True})
+
+    result = orchestrator.execute_workflow("network_audit", "10.0.0.1")
+
+    assert result["success"]
+    assert order == ["-sn", "-sS", "--script", "hydra"]
@@ -0,0 +1,42 @@
+import pytest
+
+from slm.cyberlab.kali_tools import tool_handlers
+from slm.cyberlab.kali_tools.tool_handlers import ExploitationTools, _MSFConsoleSession
+
+
+class _FakeManager:
+    def get_tool_path(self, tool):
+        return "/nonexistent/msfconsole"
+
+
+@pytest.fixture
+def fake_manager(monkeypatch):
+    monkeypatch.setattr(tool_handlers, "_get_manager", _FakeManager)
+
+
+@pytest.mark.parametrize("command", [
+    "set RHOSTS 10.0.0.1; sessions -K",
+    "set RHOSTS 10.0.0.1\nexit",
+    "set RHOSTS 10.0.0.1\x1bexit",
+])
+def test_session_rejects_command_separators(command):
+    session = _MSFConsoleSession("/nonexistent/msfconsole")
+    with pytest.raises(ValueError):
+        session.run(["use exploit/multi/handler", command])
+    # Rejected before msfconsole is started
+    assert session._process is None
+
+
+@pytest.mark.parametrize("module, options", [
+    ("exploit/multi/handler; cat /etc/passwd", {}),
+    ("exploit/multi/handler extra", {}),
+    ("exploit/multi/handler\n", {}),
+    ("exploit/multi/handler", {"RHOSTS; id": "10.0.0.1"}),
+    ("exploit/multi/handler", {"RHOSTS": "10.0.0.1; id"}),
+])
+def test_metasploit_exploit_rejects_injection(fake_manager, module, options):
+    result = ExploitationTools.metasploit_exploit(module, options)
+
+    assert result["success"] is False
+    # Refused by validation, not by the attempt to start msfconsole
+    assert "Invalid" in result["error"] or "';'" in result["error"]
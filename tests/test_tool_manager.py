@@ -0,0 +1,53 @@
+import os
+
+from slm.cyberlab.kali_tools import tool_manager
+from slm.cyberlab.kali_tools.tool_manager import KaliToolManager
+
+
+def test_tool_installed_after_startup_is_found(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    config = tmp_path / "tools.yaml"
+    config.write_text(f"tools_paths:\n  nmap: {tmp_path / 'missing' / 'nmap'}\n")
+    monkeypatch.setattr(tool_manager, "TOOL_PATHS_CACHE", tmp_path / "tool_paths.json")
+    monkeypatch.setattr(tool_manager, "COMMON_TOOL_DIRS", (str(bin_dir),))
+
+    manager = KaliToolManager(str(config))
+    assert manager.get_tool_path("nmap") is None
+
+    (bin_dir / "nmap").write_text("#!/bin/sh\n")
+    # Make the directory change visible even on coarse-mtime filesystems
+    stat = os.stat(bin_dir)
+    os.utime(bin_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert manager.is_tool_available("nmap")
+    assert manager.get_tool_path("nmap") == str(bin_dir / "nmap")
+
+
+def test_probe_matches_windows_names_case_insensitively(tmp_path, monkeypatch):
+    # Emulate Windows name handling: case-folding normcase and PATHEXT suffixes
+    monkeypatch.setattr(tool_manager.os.path, "normcase", str.lower)
+    monkeypatch.setattr(tool_manager, "_PATHEXT", (".exe", ".bat"))
+    monkeypatch.setattr(tool_manager, "COMMON_TOOL_DIRS", (str(tmp_path),))
+    (tmp_path / "NMAP.EXE").write_text("")
+    (tmp_path / "Hydra.bat").write_text("")
+
+    paths = tool_manager._probe_tool_paths({
+        "nmap": str(tmp_path / "missing" / "nmap"),
+        "hydra": str(tmp_path / "hydra"),
+    })
+
+    assert paths == {
+        "nmap": str(tmp_path / "NMAP.EXE"),
+        "hydra": str(tmp_path / "Hydra.bat"),
+    }
+
+
+def test_probe_is_exact_on_posix(tmp_path, monkeypatch):
+    monkeypatch.setattr(tool_manager, "_PATHEXT", ())
+    monkeypatch.setattr(tool_manager, "COMMON_TOOL_DIRS", (str(tmp_path),))
+    (tmp_path / "nmap").write_text("")
+
+    paths = tool_manager._probe_tool_paths({"nmap": str(tmp_path / "nmap")})
+
+    assert paths == {"nmap": str(tmp_path / "nmap")}
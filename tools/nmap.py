@@ -1,5 +1,5 @@
 import subprocess
-import json  # (kept in case you later parse XML to JSON)
+
 
 def run_scan(target: str) -> dict:
     """
@@ -8,11 +8,29 @@ def run_scan(target: str) -> dict:
     """
     # Original SYN scan
     syn_cmd = ["nmap", "-sS", "-T4", "-oX", "-", target]
-    syn_output = subprocess.check_output(syn_cmd, text=True)
 
     # Service/version and default script scan on port 22
     version_cmd = ["nmap", "-sV", "-sC", "-p", "22", "-oX", "-", target]
-    version_output = subprocess.check_output(version_cmd, text=True)
+
+    # The two scans are independent, so run them side by side; if one fails
+    # the other is killed instead of being left to finish unused
+    procs = [
+        subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        for cmd in (syn_cmd, version_cmd)
+    ]
+    try:
+        outputs = []
+        for proc in procs:
+            output, _ = proc.communicate()
+            if proc.returncode:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args, output=output)
+            outputs.append(output)
+    finally:
+        for proc in procs:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+    syn_output, version_output = outputs
 
     result = {
         "target": target,